@@ -0,0 +1,65 @@
+"""
+Benchmarks the Maze search algorithms on generated mazes.
+
+Usage: python benchmark.py [size ...] [--braid FRACTION] [--seed SEED]
+
+For every size and generator, one maze is generated and solved with each
+algorithm, reporting states explored, wall time and peak memory. Memory is
+measured in a separate run under tracemalloc so it doesn't skew timings.
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from generator import GENERATORS, generate
+from maze import Maze
+
+ALGORITHMS = ["dfs", "bfs", "greedy", "astar", "jps"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Maze search algorithms.")
+    parser.add_argument("sizes", nargs="*", type=int, default=[101, 501])
+    parser.add_argument("--braid", type=float, default=0.1,
+                        help="fraction of inner walls knocked out to add loops")
+    parser.add_argument("--seed", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'size':>6} {'generator':<12}{'algorithm':<10}{'explored':>10}"
+          f"{'length':>8}{'seconds':>10}{'peak MB':>10}")
+    for size in args.sizes:
+        for generator in GENERATORS:
+            walls, start, goal = generate(size, size, generator, args.braid, args.seed)
+            explored_by = {}
+            for algorithm in ALGORITHMS:
+                explored, length, seconds, peak = run(walls, start, goal, algorithm)
+                explored_by[algorithm] = explored
+                print(f"{size:>6} {generator:<12}{algorithm:<10}{explored:>10}"
+                      f"{length:>8}{seconds:>10.3f}{peak / 2**20:>10.1f}")
+            print(f"{'':>6} jps expands {explored_by['jps'] / explored_by['astar']:.1%} "
+                  f"of the states A* does")
+
+
+def run(walls, start, goal, algorithm):
+    """
+    Solves one maze with `algorithm`, returning
+    (states explored, path length, seconds, peak bytes allocated).
+    """
+    maze = Maze.from_grid(walls, start, goal)
+    walls.open_masks()
+
+    start_time = time.perf_counter()
+    maze.solve(algorithm)
+    seconds = time.perf_counter() - start_time
+
+    tracemalloc.start()
+    Maze.from_grid(walls, start, goal).solve(algorithm)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return maze.states_explored, len(maze.solution[0]), seconds, peak
+
+
+if __name__ == "__main__":
+    main()
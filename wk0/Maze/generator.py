@@ -0,0 +1,144 @@
+"""
+Procedural maze generator.
+
+Usage: python generator.py height width [backtracker|prim] [braid] [seed] > maze.txt
+
+Mazes live on a grid of odd size: cells at odd coordinates, walls in
+between. Both algorithms carve a perfect maze (exactly one path between
+any two cells); `braid` then knocks out that fraction of the remaining
+inner walls to add loops, which is what makes the search algorithms
+behave differently. Sizes up to 4096x4096 are fine, the grid is bit-packed.
+"""
+
+import random
+import sys
+
+from grid import WallGrid
+
+
+def main():
+    if not 3 <= len(sys.argv) <= 6:
+        sys.exit("Usage: python generator.py height width [backtracker|prim] [braid] [seed]")
+
+    height, width = int(sys.argv[1]), int(sys.argv[2])
+    algorithm = sys.argv[3] if len(sys.argv) >= 4 else "backtracker"
+    braid = float(sys.argv[4]) if len(sys.argv) >= 5 else 0
+    seed = int(sys.argv[5]) if len(sys.argv) == 6 else None
+
+    walls, start, goal = generate(height, width, algorithm, braid, seed)
+    sys.stdout.write(to_text(walls, start, goal))
+
+
+def generate(height, width, algorithm="backtracker", braid=0, seed=None):
+    """
+    Returns (walls, start, goal) for a new maze. Even sizes are rounded
+    down to odd, start is the top-left cell and goal the bottom-right.
+    """
+    if algorithm not in GENERATORS:
+        raise Exception('Unknown maze generator: ' + algorithm)
+    height -= 1 - height % 2
+    width -= 1 - width % 2
+    if height < 3 or width < 3:
+        raise Exception('Maze must be at least 3x3')
+
+    rng = random.Random(seed)
+    walls = WallGrid(height, width)
+    walls.bits[:] = b"\xff" * len(walls.bits)
+
+    GENERATORS[algorithm](walls, rng)
+    if braid:
+        _braid(walls, braid, rng)
+
+    return walls, (1, 1), (height - 2, width - 2)
+
+
+def backtracker(walls, rng):
+    """
+    Recursive backtracker (randomised depth-first search), run with an
+    explicit stack so big mazes don't hit the recursion limit.
+    """
+    height, width = walls.height, walls.width
+    walls.set(1, 1, False)
+    stack = [(1, 1)]
+
+    while stack:
+        row, col = stack[-1]
+        options = [(row + dr, col + dc) for dr, dc in ((-2, 0), (0, -2), (0, 2), (2, 0))
+                   if 0 < row + dr < height and 0 < col + dc < width
+                   and walls.get(row + dr, col + dc)]
+        if not options:
+            stack.pop()
+            continue
+        r, c = rng.choice(options)
+        walls.set((row + r) // 2, (col + c) // 2, False)
+        walls.set(r, c, False)
+        stack.append((r, c))
+
+
+def prim(walls, rng):
+    """
+    Randomised Prim's: grows the maze from one cell by repeatedly opening
+    a random wall between the maze and an unvisited cell.
+    """
+    height, width = walls.height, walls.width
+    walls.set(1, 1, False)
+    frontier = []
+
+    def add_walls(row, col):
+        for dr, dc in ((-2, 0), (0, -2), (0, 2), (2, 0)):
+            r, c = row + dr, col + dc
+            if 0 < r < height and 0 < c < width and walls.get(r, c):
+                frontier.append((row, col, r, c))
+
+    add_walls(1, 1)
+    while frontier:
+        # Random pick with swap-remove, so each step stays O(1)
+        i = rng.randrange(len(frontier))
+        frontier[i], frontier[-1] = frontier[-1], frontier[i]
+        row, col, r, c = frontier.pop()
+        if not walls.get(r, c):
+            continue
+        walls.set((row + r) // 2, (col + c) // 2, False)
+        walls.set(r, c, False)
+        add_walls(r, c)
+
+
+GENERATORS = {
+    "backtracker": backtracker,
+    "prim": prim,
+}
+
+
+def _braid(walls, fraction, rng):
+    """
+    Removes `fraction` of the walls separating two open cells.
+    """
+    for row in range(1, walls.height - 1):
+        for col in range(1 + row % 2, walls.width - 1, 2):
+            if not walls.get(row, col):
+                continue
+            if row % 2:
+                joins = not walls.get(row, col - 1) and not walls.get(row, col + 1)
+            else:
+                joins = not walls.get(row - 1, col) and not walls.get(row + 1, col)
+            if joins and rng.random() < fraction:
+                walls.set(row, col, False)
+
+
+def to_text(walls, start, goal):
+    """
+    Renders a maze in the maze.txt format read by Maze.
+    """
+    lines = []
+    for i, row in enumerate(walls):
+        line = ['#' if wall else ' ' for wall in row]
+        if i == start[0]:
+            line[start[1]] = 'A'
+        if i == goal[0]:
+            line[goal[1]] = 'B'
+        lines.append(''.join(line))
+    return '\n'.join(lines) + '\n'
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Bit-packed wall grid for large mazes.
+
+One bit per cell (row-major) instead of a list of lists of bools, so a
+4096x4096 maze needs 2MB rather than ~140MB. Open-neighbour masks for the
+four directions are computed for the whole grid at once with big-integer
+shifts, after which finding a cell's neighbours is four bit tests.
+"""
+
+# Directions in the order Maze.neighbours has always produced them
+DIRECTIONS = [
+    ("Up", -1, 0),
+    ("Left", 0, -1),
+    ("Right", 0, 1),
+    ("Down", 1, 0),
+]
+
+
+class WallGrid:
+    def __init__(self, height, width):
+        self.height = height
+        self.width = width
+        self.bits = bytearray((height * width + 7) // 8)
+
+        # Open-neighbour masks, rebuilt lazily after any wall edit
+        self.masks = None
+
+        # Bumped on every wall edit, so caches can tell they're stale
+        self.version = 0
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Builds a grid from a list of lists of bools (True = wall).
+        """
+        height = len(rows)
+        width = max((len(row) for row in rows), default=0)
+        grid = cls(height, width)
+        for i, row in enumerate(rows):
+            for j, wall in enumerate(row):
+                if wall:
+                    grid.set(i, j, True)
+        return grid
+
+    def __len__(self):
+        return self.height
+
+    def __getitem__(self, row):
+        # Keeps the walls[i][j] access of the old list of lists working
+        if not 0 <= row < self.height:
+            raise IndexError("wall grid row out of range")
+        return WallRow(self, row)
+
+    def __iter__(self):
+        for row in range(self.height):
+            yield WallRow(self, row)
+
+    def get(self, row, col):
+        i = row * self.width + col
+        return bool(self.bits[i >> 3] >> (i & 7) & 1)
+
+    def set(self, row, col, wall):
+        i = row * self.width + col
+        if wall:
+            self.bits[i >> 3] |= 1 << (i & 7)
+        else:
+            self.bits[i >> 3] &= ~(1 << (i & 7)) & 0xFF
+        self.masks = None
+        self.version += 1
+
+    def open_masks(self):
+        """
+        Returns one bit-packed mask per direction, where bit i is set if
+        cell i is open and its neighbour in that direction is open too.
+        """
+        if self.masks is not None:
+            return self.masks
+
+        height, width = self.height, self.width
+        cells = height * width
+        size = len(self.bits)
+        full = (1 << cells) - 1
+
+        open_cells = ~int.from_bytes(self.bits, "little") & full
+
+        # Cells that have a neighbour to their left / right in the same row
+        has_left = _repeat_rows(((1 << width) - 1) & ~1, width, height)
+        has_right = _repeat_rows((1 << (width - 1)) - 1, width, height)
+
+        shifted = {
+            "Up": (open_cells << width) & full,
+            "Left": (open_cells << 1) & has_left,
+            "Right": (open_cells >> 1) & has_right,
+            "Down": open_cells >> width,
+        }
+        self.masks = [(action, dr, dc, (mask & open_cells).to_bytes(size, "little"))
+                      for (action, dr, dc), mask in
+                      ((d, shifted[d[0]]) for d in DIRECTIONS)]
+        return self.masks
+
+    def neighbours(self, state):
+        """
+        Returns (action, (row, col)) for each open neighbour of `state`.
+        """
+        row, col = state
+        i = row * self.width + col
+        byte = i >> 3
+        bit = 1 << (i & 7)
+        return [(action, (row + dr, col + dc))
+                for action, dr, dc, mask in self.open_masks()
+                if mask[byte] & bit]
+
+
+class WallRow:
+    """
+    A row of a WallGrid, indexable like the old list of bools.
+    """
+
+    def __init__(self, grid, row):
+        self.grid = grid
+        self.row = row
+
+    def __len__(self):
+        return self.grid.width
+
+    def __getitem__(self, col):
+        if not 0 <= col < self.grid.width:
+            raise IndexError("wall grid column out of range")
+        return self.grid.get(self.row, col)
+
+    def __setitem__(self, col, wall):
+        if not 0 <= col < self.grid.width:
+            raise IndexError("wall grid column out of range")
+        self.grid.set(self.row, col, wall)
+
+    def __iter__(self):
+        for col in range(self.grid.width):
+            yield self.grid.get(self.row, col)
+
+
+def _repeat_rows(pattern, width, height):
+    """
+    Tiles a `width`-bit row pattern `height` times, by doubling.
+    """
+    result = 0
+    block = pattern
+    rows = 0
+    span = 1
+    while height:
+        if height & 1:
+            result |= block << (rows * width)
+            rows += span
+        block |= block << (span * width)
+        span *= 2
+        height >>= 1
+    return result
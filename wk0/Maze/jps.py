@@ -0,0 +1,144 @@
+"""
+Jump Point Search for 4-connected, uniform-cost grid mazes.
+
+Plain A* on an open grid pushes every one of the many equally short paths
+between two cells. JPS only expands "jump points": cells where a shortest
+path may have to turn. Between them it scans in straight lines without
+touching the frontier.
+
+Shortest paths are made canonical by preferring vertical moves before
+horizontal ones (the JPS4 pruning rules):
+
+- Moving horizontally, the only natural successor is straight on. Turning
+  up or down is forced only where the cell diagonally behind is a wall,
+  so the vertical-first path around it doesn't exist.
+- Moving vertically, the natural successors are straight on, left and
+  right, so every cell of a vertical scan also scans sideways, and becomes
+  a jump point if a sideways scan finds one.
+"""
+
+import heapq
+import itertools
+
+DIRECTIONS = {
+    (-1, 0): "Up",
+    (0, -1): "Left",
+    (0, 1): "Right",
+    (1, 0): "Down",
+}
+
+
+def jump_point_search(maze):
+    """
+    A* over jump points from maze.start to maze.goal, using the Manhattan
+    distance heuristic.
+
+    Returns ((actions, cells), expanded jump points), with the solution in
+    the same form as Maze.solve, or raises if there is no path.
+    """
+    walls = maze.walls
+    height, width = walls.height, walls.width
+    bits = walls.bits
+    goal = maze.goal
+
+    def open_cell(r, c):
+        if not (0 <= r < height and 0 <= c < width):
+            return False
+        i = r * width + c
+        return not bits[i >> 3] >> (i & 7) & 1
+
+    def jump_horizontal(r, c, dc):
+        while True:
+            c += dc
+            if not open_cell(r, c):
+                return None
+            if (r, c) == goal:
+                return (r, c)
+            # Forced vertical turns past a wall behind
+            if ((open_cell(r - 1, c) and not open_cell(r - 1, c - dc))
+                    or (open_cell(r + 1, c) and not open_cell(r + 1, c - dc))):
+                return (r, c)
+
+    def jump_vertical(r, c, dr):
+        while True:
+            r += dr
+            if not open_cell(r, c):
+                return None
+            if (r, c) == goal:
+                return (r, c)
+            if jump_horizontal(r, c, -1) is not None or jump_horizontal(r, c, 1) is not None:
+                return (r, c)
+
+    def successors(state, parent):
+        r, c = state
+        if parent is None:
+            directions = list(DIRECTIONS)
+        else:
+            dr = (r > parent[0]) - (r < parent[0])
+            dc = (c > parent[1]) - (c < parent[1])
+            if dr:
+                directions = [(dr, 0), (0, -1), (0, 1)]
+            else:
+                directions = [(0, dc)]
+                for side in (-1, 1):
+                    if open_cell(r + side, c) and not open_cell(r + side, c - dc):
+                        directions.append((side, 0))
+
+        for dr, dc in directions:
+            if dr:
+                point = jump_vertical(r, c, dr)
+            else:
+                point = jump_horizontal(r, c, dc)
+            if point is not None:
+                yield point
+
+    def heuristic(state):
+        return abs(state[0] - goal[0]) + abs(state[1] - goal[1])
+
+    start = maze.start
+    cost = {start: 0}
+    parent = {start: None}
+    closed = set()
+    counter = itertools.count()
+    frontier = [(heuristic(start), next(counter), start)]
+
+    while frontier:
+        _, _, state = heapq.heappop(frontier)
+        if state in closed:
+            continue
+        if state == goal:
+            return _unfold(parent, goal), closed
+        closed.add(state)
+
+        for point in successors(state, parent[state]):
+            g = cost[state] + abs(point[0] - state[0]) + abs(point[1] - state[1])
+            if point not in closed and g < cost.get(point, g + 1):
+                cost[point] = g
+                parent[point] = state
+                heapq.heappush(frontier, (g + heuristic(point), next(counter), point))
+
+    raise Exception('No solution')
+
+
+def _unfold(parent, goal):
+    """
+    Expands the chain of jump points ending at `goal` into per-cell
+    (actions, cells), excluding the start cell like Maze.solve does.
+    """
+    points = []
+    state = goal
+    while state is not None:
+        points.append(state)
+        state = parent[state]
+    points.reverse()
+
+    actions = []
+    cells = []
+    for (r, c), (nr, nc) in zip(points, points[1:]):
+        dr = (nr > r) - (nr < r)
+        dc = (nc > c) - (nc < c)
+        while (r, c) != (nr, nc):
+            r, c = r + dr, c + dc
+            actions.append(DIRECTIONS[(dr, dc)])
+            cells.append((r, c))
+    return actions, cells
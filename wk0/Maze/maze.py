@@ -1,5 +1,11 @@
+import math
 import sys
 
+from grid import WallGrid
+from jps import jump_point_search
+from planner import PathCache
+from util import StackFrontier, QueueFrontier, PriorityFrontier
+
 class Node:
     def __init__(self, state, parent, action, cost=None, steps=0):
         self.state = state
@@ -8,56 +14,42 @@ class Node:
         self.cost = cost
         self.steps = steps
 
-class Frontier:
-    def __init__(self) :
-        self.frontier = []
-    def add(self, node):
-        self.frontier.append(node)
-    def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
-    def isEmpty(self):
-        return len(self.frontier) == 0
-    def get(self):
-        raise NotImplementedError('Implement this dude!')
-
-class StackFrontier(Frontier):      # That means it inherits from Frontier
-    def get(self):
-        if len(self.frontier) == 0:
-            raise Exception('Frontier empty')
-        else:
-            return self.frontier.pop()  # By default removes the last element.
-
-class QueueFrontier(Frontier):
-    def get(self):
-        if len(self.frontier) == 0:
-            raise Exception('Frontier empty')
-        else:
-            return self.frontier.pop(0)
-
-class ModifiedQueueFrontier(QueueFrontier):
-    def get(self):
-        if len(self.frontier) == 0:
-            raise Exception('Frontier empty')
-        else:
-            least_cost_index = 0
-
-            for node in self.frontier:
-                if node.cost < self.frontier[least_cost_index].cost:
-                    least_cost_index = self.frontier.index(node)
-
-            return self.frontier.pop(least_cost_index)        
-
-class AstarFrontier(QueueFrontier):
-    def get(self):
-        if len(self.frontier) == 0:
-            raise Exception('Frontier empty')
-        else:
-            least_netCost_index = 0
-            for node in self.frontier:
-                if (node.cost + node.steps) < (self.frontier[least_netCost_index].cost + self.frontier[least_netCost_index].steps):
-                    least_netCost_index = self.frontier.index(node)
-
-            return self.frontier.pop(least_netCost_index)    
+class ModifiedQueueFrontier(PriorityFrontier):
+    # Greedy best-first: least heuristic cost first, earliest added on ties
+    def __init__(self):
+        super().__init__(lambda node: node.cost)
+
+class AstarFrontier(PriorityFrontier):
+    # A*: least heuristic cost + steps taken first, earliest added on ties
+    def __init__(self):
+        super().__init__(lambda node: node.cost + node.steps)
+
+
+# Heuristics: estimated distance from a state to the goal
+def manhattan(state, goal):
+    return abs(state[0] - goal[0]) + abs(state[1] - goal[1])
+
+def euclidean(state, goal):
+    return math.hypot(state[0] - goal[0], state[1] - goal[1])
+
+def zero(state, goal):
+    # A* with no heuristic is Dijkstra's algorithm
+    return 0
+
+HEURISTICS = {
+    "manhattan": manhattan,
+    "euclidean": euclidean,
+    "zero": zero,
+}
+
+# Search algorithm name -> (frontier class, heuristic override)
+ALGORITHMS = {
+    "dfs": (StackFrontier, None),
+    "bfs": (QueueFrontier, None),
+    "greedy": (ModifiedQueueFrontier, None),
+    "astar": (AstarFrontier, None),
+    "dijkstra": (AstarFrontier, zero),
+}
 
 
 class Maze:
@@ -78,50 +70,78 @@ class Maze:
         self.height = len(contents)
         self.width = max(len(row) for row in contents)
 
-        # Keeping track of walls
-        self.walls = []
+        # Keeping track of walls, one bit per cell
+        self.walls = WallGrid(self.height, self.width)
 
         for i in range(self.height):
-            wall = []
-            for j in range(self.width):
-                try:
-                    if contents[i][j] == 'A':
-                        self.start = (i,j)
-                    elif contents[i][j] == 'B':
-                        self.goal = (i,j)
-                    
-                    wall.append(contents[i][j]=='#')
-                except IndexError:
-                    wall.append(False)
-            self.walls.append(wall)
-
+            for j, char in enumerate(contents[i]):
+                if char == 'A':
+                    self.start = (i,j)
+                elif char == 'B':
+                    self.goal = (i,j)
+                elif char == '#':
+                    self.walls.set(i, j, True)
+
+        self._reset(show_explored)
+
+    @classmethod
+    def from_grid(cls, walls, start, goal, show_explored=False):
+        # Builds a Maze straight from a WallGrid, e.g. one made by generator.py
+        maze = cls.__new__(cls)
+        maze.height = walls.height
+        maze.width = walls.width
+        maze.walls = walls
+        maze.start = start
+        maze.goal = goal
+        maze._reset(show_explored)
+        return maze
+
+    def _reset(self, show_explored):
+        # Solved paths, dropped whenever a wall changes
+        self.cache = PathCache(self.walls)
         self.solution = None
         self.show_explored = show_explored
         self.explored = set()
+        self.heuristic = manhattan
 
     def neighbours(self, state):
-        row, col = state
-
-        candidates = [ ("Up", (row-1, col)),
-        ("Left", (row, col-1)),
-        ("Right", (row, col+1)),
-        ("Down", (row+1, col))]
-
-        result=[]
-
-        for action, (r, c) in candidates:
-            if 0 <= r < self.height and 0 <= c < self.width and not self.walls[r][c]:
-                result.append((action, (r,c)))
-        return result
-
-
-    def solve(self):
+        # Up, Left, Right, Down moves into open cells, read off the wall grid's
+        # precomputed direction masks
+        return self.walls.neighbours(state)
+
+
+    def solve(self, algorithm="greedy", heuristic=manhattan):
+        # algorithm: "dfs", "bfs", "greedy", "astar", "dijkstra" or "jps", or a frontier class
+        # heuristic: function(state, goal) estimating the remaining distance
+
+        # Same start, goal, search and walls as before: reuse the answer
+        method = (algorithm, heuristic)
+        cached = self.cache.get(self.start, self.goal, method)
+        if cached is not None:
+            self.solution = cached
+            self.states_explored = 0
+            self.explored = set()
+            return
+
+        if algorithm == "jps":
+            # Jump Point Search only expands jump points, which is what gets counted
+            self.solution, self.explored = jump_point_search(self)
+            self.states_explored = len(self.explored)
+            self.cache.put(self.start, self.goal, method, self.solution)
+            return
+
+        if isinstance(algorithm, str):
+            if algorithm not in ALGORITHMS:
+                raise Exception('Unknown algorithm: ' + algorithm)
+            algorithm, override = ALGORITHMS[algorithm]
+            heuristic = override or heuristic
+        self.heuristic = heuristic
 
         # To Keep track of states explored
         self.states_explored = 0
 
         start = Node(state=self.start, parent=None, action=None, cost=self.cost(self.start))
-        frontier = ModifiedQueueFrontier()      # Use StackFrontier = DFS, QueueFrontier = BFS, ModifiedQueueFrontier = G-BFS, AstarFrontier = AstarFrontier 
+        frontier = algorithm()
         frontier.add(start)
 
         # To avoid loops from revisiting previously explored nodes.
@@ -149,20 +169,20 @@ class Maze:
                 cells.reverse()
                 actions.reverse()
                 self.solution = (actions, cells)
+                self.cache.put(self.start, self.goal, method, self.solution)
                 return
             else:
                 # Mark it as explored
                 self.explored.add(node.state)
                 # Adding neighbours to frontier
+                # (Priority frontiers keep the better of two nodes for a state themselves)
                 for action, state in self.neighbours(node.state):
-                    if not frontier.contains_state(state) and state not in self.explored:
+                    if state not in self.explored and (frontier.decrease_key or not frontier.contains_state(state)):
                         child = Node(state = state, parent = node, action = action, cost = self.cost(state), steps = node.steps+1)
                         frontier.add(child)
 
     def cost(self, state):
-        manh_dist = abs(state[0] - self.goal[0]) + abs(state[1] - self.goal[1])
-        return manh_dist
-        
+        return self.heuristic(state, self.goal)
 
 
     def print(self):
@@ -189,22 +209,31 @@ class Maze:
             print()
         print()
 
-        
-if len(sys.argv) != 2:
-    sys.exit("Usage: python maze.py maze.txt")
 
 
-maze = Maze(sys.argv[1], show_explored=True)
+def main():
+    if not 2 <= len(sys.argv) <= 4:
+        sys.exit("Usage: python maze.py maze.txt [dfs|bfs|greedy|astar|dijkstra|jps] [manhattan|euclidean|zero]")
+
+    algorithm = sys.argv[2] if len(sys.argv) >= 3 else "greedy"
+    heuristic = sys.argv[3] if len(sys.argv) == 4 else "manhattan"
+    if (algorithm not in ALGORITHMS and algorithm != "jps") or heuristic not in HEURISTICS:
+        sys.exit("Unknown algorithm or heuristic")
+
+    maze = Maze(sys.argv[1], show_explored=True)
+
+    print("Here's the Maze:")
+    maze.print()
 
-print("Here's the Maze:")
-maze.print()
+    print("Solving...")
+    maze.solve(algorithm, HEURISTICS[heuristic])
+    print("Solved.")
+    print()
+    print("States explored = " + str(maze.states_explored ), end='\n\n')
 
-print("Solving...")
-maze.solve()
-print("Solved.")
-print()
-print("States explored = " + str(maze.states_explored ), end='\n\n')
+    print("Solution:")
+    maze.print()
 
-print("Solution:")
-maze.print()
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Incremental re-planning and path caching for Maze.
+
+DStarLite keeps its search state between calls, so after the start cell
+moves or a few walls are toggled, re-planning only repairs the part of
+the search the change affects instead of solving from scratch. The search
+runs backwards from the goal, which is what makes start moves cheap; a new
+goal means starting over.
+
+PathCache remembers solved (start, goal) paths and drops them all as soon
+as any wall changes.
+"""
+
+import heapq
+import itertools
+
+INFINITY = float("inf")
+
+# Same move order as Maze.neighbours
+MOVES = [
+    ("Up", -1, 0),
+    ("Left", 0, -1),
+    ("Right", 0, 1),
+    ("Down", 1, 0),
+]
+
+
+class DStarLite:
+    def __init__(self, maze):
+        self.maze = maze
+        self.walls = maze.walls
+        self.start = maze.start
+        self.goal = maze.goal
+        self.states_explored = 0
+        self._initialize()
+
+    def _initialize(self):
+        self.g = {}
+        self.rhs = {self.goal: 0}
+        self.km = 0
+        self.last = self.start
+        self.queue = []
+        self.queued = {}
+        self.counter = itertools.count()
+        self.version = self.walls.version
+        self._push(self.goal, self._key(self.goal))
+
+    def plan(self):
+        """
+        Brings the search up to date and returns the (actions, cells)
+        solution from the current start to the goal, like Maze.solve.
+        `states_explored` counts the states expanded by this call only.
+        """
+        # Walls edited behind our back: nothing to reuse safely
+        if self.walls.version != self.version:
+            self._initialize()
+
+        self.states_explored = 0
+        self._compute()
+
+        if self._g(self.start) == INFINITY:
+            raise Exception('No solution')
+
+        actions = []
+        cells = []
+        state = self.start
+        while state != self.goal:
+            best = None
+            for action, neighbour in self._neighbours(state):
+                cost = self._cost(state, neighbour) + self._g(neighbour)
+                if best is None or cost < best[0]:
+                    best = (cost, action, neighbour)
+            _, action, state = best
+            actions.append(action)
+            cells.append(state)
+
+        self.maze.start = self.start
+        self.maze.solution = (actions, cells)
+        return actions, cells
+
+    def move_start(self, state):
+        """
+        Moves the start cell, e.g. after the agent took some steps.
+        """
+        self.km += _manhattan(self.last, state)
+        self.last = state
+        self.start = state
+
+    def set_goal(self, state):
+        """
+        Changes the goal. The search is rooted at the goal, so this
+        starts it over.
+        """
+        self.goal = state
+        self.maze.goal = state
+        self._initialize()
+
+    def set_wall(self, row, col, wall):
+        """
+        Toggles one wall on the maze and queues the affected cells for
+        repair on the next plan().
+        """
+        if self.walls.get(row, col) == wall:
+            return
+        self.walls.set(row, col, wall)
+        self.version = self.walls.version
+
+        # Keys computed since the start last moved must stay comparable
+        self.km += _manhattan(self.last, self.start)
+        self.last = self.start
+
+        cell = (row, col)
+        self._update(cell)
+        for _, neighbour in self._neighbours(cell):
+            self._update(neighbour)
+
+    # D* Lite internals
+
+    def _g(self, state):
+        return self.g.get(state, INFINITY)
+
+    def _rhs(self, state):
+        return self.rhs.get(state, INFINITY)
+
+    def _key(self, state):
+        best = min(self._g(state), self._rhs(state))
+        return (best + _manhattan(self.start, state) + self.km, best)
+
+    def _push(self, state, key):
+        self.queued[state] = key
+        heapq.heappush(self.queue, (key, next(self.counter), state))
+
+    def _top(self):
+        # Drop entries superseded or removed since they were pushed
+        while self.queue:
+            key, _, state = self.queue[0]
+            if self.queued.get(state) == key:
+                return key, state
+            heapq.heappop(self.queue)
+        return (INFINITY, INFINITY), None
+
+    def _open(self, state):
+        return not self.walls.get(*state)
+
+    def _cost(self, a, b):
+        return 1 if self._open(a) and self._open(b) else INFINITY
+
+    def _neighbours(self, state):
+        row, col = state
+        for action, dr, dc in MOVES:
+            r, c = row + dr, col + dc
+            if 0 <= r < self.walls.height and 0 <= c < self.walls.width:
+                yield action, (r, c)
+
+    def _update(self, state):
+        if state != self.goal:
+            best = INFINITY
+            if self._open(state):
+                for _, neighbour in self._neighbours(state):
+                    best = min(best, self._cost(state, neighbour) + self._g(neighbour))
+            self.rhs[state] = best
+        self.queued.pop(state, None)
+        if self._g(state) != self._rhs(state):
+            self._push(state, self._key(state))
+
+    def _compute(self):
+        while True:
+            top_key, state = self._top()
+            if state is None or (top_key >= self._key(self.start)
+                                 and self._rhs(self.start) == self._g(self.start)):
+                return
+
+            heapq.heappop(self.queue)
+            del self.queued[state]
+            self.states_explored += 1
+
+            new_key = self._key(state)
+            if top_key < new_key:
+                self._push(state, new_key)
+            elif self._g(state) > self._rhs(state):
+                self.g[state] = self._rhs(state)
+                for _, neighbour in self._neighbours(state):
+                    self._update(neighbour)
+            else:
+                self.g[state] = INFINITY
+                self._update(state)
+                for _, neighbour in self._neighbours(state):
+                    self._update(neighbour)
+
+
+class PathCache:
+    """
+    Solutions keyed by (start, goal, algorithm), valid for one version of
+    the wall grid.
+    """
+
+    def __init__(self, walls):
+        self.walls = walls
+        self.version = walls.version
+        self.paths = {}
+
+    def get(self, start, goal, algorithm):
+        self._check()
+        return self.paths.get((start, goal, algorithm))
+
+    def put(self, start, goal, algorithm, solution):
+        self._check()
+        self.paths[(start, goal, algorithm)] = solution
+
+    def _check(self):
+        if self.walls.version != self.version:
+            self.paths.clear()
+            self.version = self.walls.version
+
+
+def _manhattan(a, b):
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
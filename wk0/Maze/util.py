@@ -0,0 +1,144 @@
+import heapq
+import itertools
+from collections import deque
+
+
+class Node():
+    def __init__(self, state, parent, action):
+        self.state = state
+        self.parent = parent
+        self.action = action
+
+
+class Frontier():
+    """
+    Base class for frontiers. Every frontier keeps a count of the nodes
+    it holds per state, so `contains_state` is O(1) instead of a scan.
+
+    Frontiers answer to both `empty`/`remove` and `isEmpty`/`get`.
+    """
+
+    # Whether adding a state already in the frontier updates it in place
+    # (decrease-key), rather than the caller having to skip it.
+    decrease_key = False
+
+    def __init__(self):
+        self.states = {}
+
+    def __len__(self):
+        return len(self.frontier)
+
+    def add(self, node):
+        self._push(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
+    def contains_state(self, state):
+        return state in self.states
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        node = self._pop()
+        self._forget(node.state)
+        return node
+
+    def _forget(self, state):
+        count = self.states[state] - 1
+        if count:
+            self.states[state] = count
+        else:
+            del self.states[state]
+
+    def _push(self, node):
+        raise NotImplementedError
+
+    def _pop(self):
+        raise NotImplementedError
+
+    # Aliases used by the Maze solver
+    def isEmpty(self):
+        return self.empty()
+
+    def get(self):
+        return self.remove()
+
+
+class StackFrontier(Frontier):
+    """
+    Last in, first out: depth-first search.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.frontier = []
+
+    def _push(self, node):
+        self.frontier.append(node)
+
+    def _pop(self):
+        return self.frontier.pop()
+
+
+class QueueFrontier(Frontier):
+    """
+    First in, first out: breadth-first search.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.frontier = deque()
+
+    def _push(self, node):
+        self.frontier.append(node)
+
+    def _pop(self):
+        return self.frontier.popleft()
+
+
+class PriorityFrontier(Frontier):
+    """
+    Removes the node with the lowest `priority(node)` first, ties going to
+    the node added earliest.
+
+    Only the best node per state is kept: adding a state again with a lower
+    priority replaces the old node (decrease-key), and the stale heap entry
+    is skipped when it surfaces.
+    """
+
+    decrease_key = True
+
+    def __init__(self, priority):
+        super().__init__()
+        self.priority = priority
+        self.frontier = []
+        self.best = {}
+        self.counter = itertools.count()
+
+    def __len__(self):
+        return len(self.best)
+
+    def add(self, node):
+        value = self.priority(node)
+        current = self.best.get(node.state)
+        if current is not None:
+            if current[0] <= value:
+                return
+        else:
+            self.states[node.state] = 1
+        entry = (value, next(self.counter), node)
+        self.best[node.state] = entry
+        heapq.heappush(self.frontier, entry)
+
+    def empty(self):
+        return len(self.best) == 0
+
+    def _pop(self):
+        while True:
+            entry = heapq.heappop(self.frontier)
+            node = entry[2]
+            if self.best.get(node.state) is entry:
+                del self.best[node.state]
+                return node
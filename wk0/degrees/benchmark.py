@@ -0,0 +1,105 @@
+"""
+Compares the degrees search algorithms on random actor pairs.
+
+Usage: python benchmark.py [directory] [pairs]
+
+If `directory` is "random", a synthetic co-star graph is generated instead
+of loading CSV files, which is handy when the large dataset isn't around.
+"""
+
+import random
+import sys
+import time
+from array import array
+
+from graph import CoStarGraph
+from landmarks import LandmarkIndex
+
+ALGORITHMS = ["bfs", "bidirectional", "landmark"]
+SEED = 50
+
+
+def main():
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python benchmark.py [directory] [pairs]")
+    directory = sys.argv[1] if len(sys.argv) >= 2 else "large"
+    pairs = int(sys.argv[2]) if len(sys.argv) == 3 else 100
+
+    print("Loading data...")
+    start = time.perf_counter()
+    graph = random_graph() if directory == "random" else load(directory)
+    print(f"Data loaded in {time.perf_counter() - start:.2f}s: "
+          f"{graph.person_count()} people, {graph.movie_count()} movies.")
+
+    start = time.perf_counter()
+    graph.landmarks = LandmarkIndex.build(graph)
+    print(f"Landmark index built in {time.perf_counter() - start:.2f}s.")
+
+    rng = random.Random(SEED)
+    queries = [(rng.randrange(graph.person_count()), rng.randrange(graph.person_count()))
+               for _ in range(pairs)]
+
+    results = benchmark(graph, queries, ALGORITHMS)
+
+    print(f"{'algorithm':<15}{'expanded/query':>16}{'ms/query':>12}")
+    for algorithm in ALGORITHMS:
+        expanded, elapsed = results[algorithm]
+        print(f"{algorithm:<15}{expanded / pairs:>16.1f}{1000 * elapsed / pairs:>12.3f}")
+
+
+def benchmark(graph, queries, algorithms):
+    """
+    Runs every query with every algorithm, checking they agree on path
+    length. Returns {algorithm: (people expanded, seconds)}.
+    """
+    results = {}
+    lengths = {}
+    for algorithm in algorithms:
+        expanded = 0
+        start = time.perf_counter()
+        for source, target in queries:
+            path, count = graph.search(source, target, algorithm)
+            expanded += count
+            length = None if path is None else len(path)
+            if lengths.setdefault((source, target), length) != length:
+                raise Exception(f"{algorithm} disagrees on {source} -> {target}")
+        results[algorithm] = (expanded, time.perf_counter() - start)
+    return results
+
+
+def load(directory):
+    graph = CoStarGraph()
+    graph.load(directory)
+    return graph
+
+
+def random_graph(people=200000, movies=40000, cast=6):
+    """
+    Builds a synthetic graph where each movie casts a few people, with a
+    skew towards a smaller pool of prolific actors.
+    """
+    rng = random.Random(SEED)
+    graph = CoStarGraph()
+    graph.set_people([str(p) for p in range(people)],
+                     [f"Person {p}" for p in range(people)], [""] * people)
+    graph.set_movies([str(m) for m in range(movies)],
+                     [f"Movie {m}" for m in range(movies)], [""] * movies)
+
+    star_people = array('i')
+    star_movies = array('i')
+    prolific = people // 20
+    for m in range(movies):
+        stars = set()
+        while len(stars) < cast:
+            pool = prolific if rng.random() < 0.5 else people
+            stars.add(rng.randrange(pool))
+        for p in stars:
+            star_people.append(p)
+            star_movies.append(m)
+
+    graph.build(star_people, star_movies)
+    return graph
+
+
+if __name__ == "__main__":
+    main()
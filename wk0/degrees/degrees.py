@@ -1,68 +1,90 @@
-import csv
+import argparse
+import json
 import sys
+import threading
+import time
 
-from util import Node, StackFrontier, QueueFrontier
+from graph import CoStarGraph
+from landmarks import LandmarkIndex
+from names import NameIndex
+
+ALGORITHMS = ["bfs", "bidirectional", "landmark"]
+
+# Interned co-star graph backing the dict views below
+graph = CoStarGraph()
 
 # Maps names to a set of corresponding person_ids
-names = {}
+names = graph.names_view()
 
 # Maps person_ids to a dictionary of: name, birth, movies (a set of movie_ids)
-people = {}
+people = graph.people_view()
 
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
-movies = {}
-
-
-def load_data(directory):
-    """
-    Load data from CSV files into memory.
-    """
-    # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
-
-    # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set()
-            }
-
-    # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+movies = graph.movies_view()
+
+# Prefix and fuzzy lookup for names not found exactly
+name_search = NameIndex(graph)
+
+# Directory the data was loaded from, where the landmark index is cached
+data_directory = None
+
+# Held while the landmark index is loaded, which server threads may race on
+landmarks_lock = threading.Lock()
+
+
+def load_data(directory, algorithm="bfs"):
+    """
+    Load data from CSV files into memory, going through the compiled
+    snapshot in `directory` when it is up to date.
+
+    The landmark index is loaded (or built) up front for
+    algorithm="landmark", and otherwise on the first landmark query.
+    """
+    global name_search, data_directory
+    graph.load_cached(directory)
+    name_search = NameIndex(graph, directory)
+    data_directory = directory
+    if algorithm == "landmark":
+        load_landmarks()
+
+
+def load_landmarks():
+    """
+    Loads the landmark index for the loaded graph if it isn't already.
+    """
+    with landmarks_lock:
+        if graph.landmarks is None:
+            graph.landmarks = LandmarkIndex.load_cached(graph, data_directory)
 
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    
-    # directory = 'small' #
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    parser = argparse.ArgumentParser(description="Degrees of separation between actors.")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--algorithm", choices=ALGORITHMS, default="bfs",
+                        help="plain BFS, bidirectional BFS or landmark-pruned bidirectional BFS")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--batch", metavar="FILE",
+                      help="answer tab-separated name pairs from FILE ('-' for stdin)")
+    mode.add_argument("--serve", metavar="PORT", type=int,
+                      help="answer queries over HTTP on localhost:PORT")
+    args = parser.parse_args()
 
     # Load data from files into memory
-    print("Loading data...")
-    load_data(directory)
-    print("Data loaded.")
+    print("Loading data...", file=sys.stderr if args.batch else sys.stdout)
+    load_data(args.directory, args.algorithm)
+    print("Data loaded.", file=sys.stderr if args.batch else sys.stdout)
+
+    if args.batch:
+        if args.batch == "-":
+            run_batch(sys.stdin, sys.stdout, args.algorithm)
+        else:
+            with open(args.batch, encoding="utf-8") as f:
+                run_batch(f, sys.stdout, args.algorithm)
+        return
+    if args.serve is not None:
+        from server import serve
+        serve(args.serve, query, args.algorithm)
+        return
 
     source = person_id_for_name(input("Name: "))
     if source is None:
@@ -71,7 +93,7 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    path = shortest_path(source, target, args.algorithm)
 
     if path is None:
         print("Not connected.")
@@ -86,49 +108,98 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def run_batch(lines, out, algorithm="bfs"):
+    """
+    Answers one "source name<TAB>target name" query per input line,
+    writing one JSON result per output line and a latency summary to stderr.
+    """
+    latencies = []
+    for line in lines:
+        line = line.rstrip("\n")
+        if not line.strip():
+            continue
+        try:
+            source_name, target_name = line.split("\t")
+        except ValueError:
+            out.write(json.dumps({"query": line, "error": "expected two tab-separated names"}) + "\n")
+            continue
+        answer = query(source_name, target_name, algorithm)
+        latencies.append(answer["ms"])
+        out.write(json.dumps(answer) + "\n")
+
+    if latencies:
+        latencies.sort()
+        mean = sum(latencies) / len(latencies)
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"{len(latencies)} queries: mean {mean:.3f} ms, "
+              f"p50 {latencies[len(latencies) // 2]:.3f} ms, p99 {p99:.3f} ms",
+              file=sys.stderr)
+
+
+def query(source_name, target_name, algorithm="bfs"):
+    """
+    Answers a single non-interactive query between two names, timing it.
+    Ambiguous names are reported as errors rather than prompted for.
+
+    Returns a dictionary with the source, target, degrees, path as
+    [movie title, person name] steps, people expanded by the search, and
+    latency in milliseconds.
+    """
+    start = time.perf_counter()
+    answer = {"source": source_name, "target": target_name}
+
+    source_ids = person_ids_for_name(source_name)
+    target_ids = person_ids_for_name(target_name)
+    for name, ids in ((source_name, source_ids), (target_name, target_ids)):
+        if len(ids) != 1:
+            answer["error"] = f"{'no' if not ids else 'ambiguous'} person named '{name}'"
+            if not ids:
+                answer["suggestions"] = [graph.person_names[matches[0]]
+                                         for _, matches in name_search.search(name)]
+            break
+    else:
+        if source_ids == target_ids:
+            path, expanded = [], 0
+        else:
+            path, expanded = search(source_ids[0], target_ids[0], algorithm)
+        answer["expanded"] = expanded
+        if path is None:
+            answer["degrees"] = None
+        else:
+            answer["degrees"] = len(path)
+            answer["path"] = [[movies[movie_id]["title"], people[person_id]["name"]]
+                              for movie_id, person_id in path]
+
+    answer["ms"] = round(1000 * (time.perf_counter() - start), 3)
+    return answer
+
+
+def shortest_path(source, target, algorithm="bfs"):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
+    `algorithm` picks the search: "bfs", "bidirectional" or "landmark".
+
     If no possible path, returns None.
     """
 
     if not source or not target or source == target:
         return None
+    return search(source, target, algorithm)[0]
 
-    # Initialization    
-    start = Node(state=source, parent=None, action=None)
-    frontier = QueueFrontier()
-    frontier.add(start)
-    
-    explored = set()
-    explored.add(source)
-
-    while(True):
-        if frontier.empty():
-            return None
-        else:
-            node = frontier.remove()
-
-            # If Target
-            if node.state == target:
-                results = []
 
-                while node.parent != None:
-                    results.append((node.action, node.state))
-                    node = node.parent
-
-                results.reverse()
-            
-                return results
-
-            # Else adding to frontier
-            for (movie_id, person_id) in neighbors_for_person(node.state):
-                if person_id not in explored and not frontier.contains_state(person_id):
-                    child = Node(state=person_id, parent=node, action=movie_id)
-                    frontier.add(child)
-                    explored.add(child)
+def search(source, target, algorithm="bfs"):
+    """
+    Like shortest_path, but returns (path, number of people expanded).
+    """
+    if algorithm == "landmark":
+        load_landmarks()
+    path, expanded = graph.search(graph.person_index[source], graph.person_index[target],
+                                  algorithm)
+    if path is None:
+        return None, expanded
+    return [(graph.movie_ids[m], graph.person_ids[p]) for m, p in path], expanded
 
 
 def person_id_for_name(name):
@@ -136,9 +207,9 @@ def person_id_for_name(name):
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    person_ids = person_ids_for_name(name)
     if len(person_ids) == 0:
-        return None
+        return suggest_person_id(name)
     elif len(person_ids) > 1:
         print(f"Which '{name}'?")
         for person_id in person_ids:
@@ -157,16 +228,48 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def suggest_person_id(name):
+    """
+    Offers the closest matching names for a name that wasn't found,
+    returning the IMDB id of the one picked, or None.
+    """
+    matches = []
+    for _, person_indices in name_search.search(name):
+        matches.extend(graph.person_ids[p] for p in person_indices)
+    if not matches:
+        return None
+
+    print(f"No exact match for '{name}'. Did you mean:")
+    for i, person_id in enumerate(matches, 1):
+        person = people[person_id]
+        print(f"{i}: {person['name']}, Birth: {person['birth']}, ID: {person_id}")
+    try:
+        choice = int(input("Intended Person number: "))
+        if 1 <= choice <= len(matches):
+            return matches[choice - 1]
+    except ValueError:
+        pass
+    return None
+
+
+def person_ids_for_name(name):
+    """
+    Returns every IMDB id matching a person's name.
+    """
+    return sorted(names.get(name.lower(), set()))
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
-    movie_ids = people[person_id]["movies"]
+    p = graph.person_index[person_id]
     neighbors = set()
-    for movie_id in movie_ids:
-        for person_id in movies[movie_id]["stars"]:
-            neighbors.add((movie_id, person_id))
+    for m in graph.movies_of(p):
+        movie_id = graph.movie_ids[m]
+        for q in graph.stars_of(m):
+            neighbors.add((movie_id, graph.person_ids[q]))
     return neighbors
 
 
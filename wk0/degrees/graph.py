@@ -0,0 +1,700 @@
+"""
+Compact co-star graph for degrees.py.
+
+People and movies are interned to small integers, and the person -> movies
+and movie -> stars relations are kept as compressed-sparse-row arrays, so
+the whole graph is a handful of flat `array('i')` buffers instead of
+millions of dicts and sets of IMDB id strings.
+
+The compiled graph is cached as a versioned snapshot next to the CSV files
+and rebuilt automatically when they change.
+"""
+
+import csv
+import hashlib
+import os
+import pickle
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping
+
+# Bump whenever the snapshot layout changes
+SNAPSHOT_VERSION = 1
+# Graph attributes written to and restored from the snapshot
+SNAPSHOT_FIELDS = [
+    "person_ids", "person_names", "person_births", "person_index", "name_index",
+    "movie_ids", "movie_titles", "movie_years", "movie_index",
+    "person_offsets", "person_movies", "movie_offsets", "movie_stars",
+]
+SNAPSHOT_NAME = "snapshot.pickle"
+SOURCES = ["people.csv", "movies.csv", "stars.csv"]
+
+
+class CoStarGraph:
+    def __init__(self):
+        # Interned ids: person_ids[p] is the IMDB id of person index p, and
+        # person_index maps IMDB ids back to indices. String columns are
+        # StringTables, so the graph holds no per-person Python objects.
+        self.set_people([], [], [])
+        self.set_movies([], [], [])
+
+        # CSR adjacency: movies of person p are
+        # person_movies[person_offsets[p]:person_offsets[p + 1]]
+        self.build(array('i'), array('i'))
+
+        # Optional LandmarkIndex for algorithm="landmark"
+        self.landmarks = None
+
+    def person_count(self):
+        return len(self.person_ids)
+
+    def movie_count(self):
+        return len(self.movie_ids)
+
+    def load(self, directory):
+        """
+        Load people, movies and stars CSV files from `directory`.
+        """
+        # Load people
+        person_index = {}
+        ids, names, births = [], [], []
+        with open(f"{directory}/people.csv", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                if row["id"] in person_index:
+                    continue
+                person_index[row["id"]] = len(ids)
+                ids.append(row["id"])
+                names.append(row["name"])
+                births.append(row["birth"])
+        self.set_people(ids, names, births)
+
+        # Load movies
+        movie_index = {}
+        ids, titles, years = [], [], []
+        with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                if row["id"] in movie_index:
+                    continue
+                movie_index[row["id"]] = len(ids)
+                ids.append(row["id"])
+                titles.append(row["title"])
+                years.append(row["year"])
+        self.set_movies(ids, titles, years)
+
+        # Load stars as flat (person, movie) columns, dropping unknown ids
+        # and duplicate rows.
+        star_people = array('i')
+        star_movies = array('i')
+        seen = set()
+        movie_total = len(ids)
+        with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                p = person_index.get(row["person_id"])
+                m = movie_index.get(row["movie_id"])
+                if p is None or m is None:
+                    continue
+                key = p * movie_total + m
+                if key in seen:
+                    continue
+                seen.add(key)
+                star_people.append(p)
+                star_movies.append(m)
+
+        self.build(star_people, star_movies)
+
+    def load_cached(self, directory):
+        """
+        Load the graph from the snapshot in `directory`, falling back to
+        the CSV files (and writing a fresh snapshot) if the snapshot is
+        missing, from another version, or older than its sources.
+        Returns whether the snapshot was used.
+        """
+        self.landmarks = None
+        built = []
+
+        def build():
+            self.load(directory)
+            built.append(True)
+            return {field: getattr(self, field) for field in SNAPSHOT_FIELDS}
+
+        state = _load_or_build(os.path.join(directory, SNAPSHOT_NAME), directory,
+                               SNAPSHOT_VERSION, build)
+        if built:
+            return False
+        for field in SNAPSHOT_FIELDS:
+            setattr(self, field, state[field])
+        return True
+
+    def set_people(self, ids, names, births):
+        """
+        Intern the people columns, in person index order.
+        """
+        lowered = [name.lower() for name in names]
+        self.person_ids = StringTable(ids)
+        self.person_names = StringTable(names)
+        self.person_births = StringTable(births)
+        self.person_index = SortedIndex(self.person_ids, ids)
+        self.name_index = GroupIndex(StringTable(lowered), lowered)
+
+    def set_movies(self, ids, titles, years):
+        """
+        Intern the movie columns, in movie index order.
+        """
+        self.movie_ids = StringTable(ids)
+        self.movie_titles = StringTable(titles)
+        self.movie_years = StringTable(years)
+        self.movie_index = SortedIndex(self.movie_ids, ids)
+
+    def build(self, star_people, star_movies):
+        """
+        Build both CSR relations from parallel person/movie columns.
+        """
+        self.person_offsets, self.person_movies = _csr(
+            star_people, star_movies, len(self.person_ids))
+        self.movie_offsets, self.movie_stars = _csr(
+            star_movies, star_people, len(self.movie_ids))
+
+    def movies_of(self, p):
+        """
+        Returns the movie indices person `p` starred in.
+        """
+        return self.person_movies[self.person_offsets[p]:self.person_offsets[p + 1]]
+
+    def stars_of(self, m):
+        """
+        Returns the person indices who starred in movie `m`.
+        """
+        return self.movie_stars[self.movie_offsets[m]:self.movie_offsets[m + 1]]
+
+    def shortest_path(self, source, target, algorithm="bfs"):
+        """
+        Returns a shortest list of (movie, person) index pairs connecting
+        person indices `source` and `target`, or None if not connected.
+
+        `algorithm` is one of "bfs", "bidirectional" or "landmark", the
+        last needing `self.landmarks` to hold a LandmarkIndex.
+        """
+        return self.search(source, target, algorithm)[0]
+
+    def search(self, source, target, algorithm="bfs"):
+        """
+        Like shortest_path, but returns (path, number of people expanded).
+        The count is returned rather than kept on the graph so that
+        concurrent searches (the HTTP server's threads) don't mix them up.
+        """
+        if algorithm == "bfs":
+            return self.bfs_path(source, target)
+        elif algorithm == "bidirectional":
+            return self.bidirectional_path(source, target)
+        elif algorithm == "landmark":
+            if self.landmarks is None:
+                raise Exception("Landmark index not loaded")
+            return self.landmarks.shortest_path(source, target)
+        raise Exception(f"Unknown search algorithm: {algorithm}")
+
+    def bfs_path(self, source, target):
+        """
+        One-sided breadth-first search from `source`. Returns (path,
+        people expanded).
+        """
+        expanded = 0
+        if source == target:
+            return [], expanded
+
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+
+        # Parent pointers double as the explored set.
+        parent_person = {source: -1}
+        parent_movie = {source: -1}
+        seen_movies = set()
+        layer = [source]
+
+        while layer:
+            next_layer = []
+            for p in layer:
+                expanded += 1
+                for i in range(person_offsets[p], person_offsets[p + 1]):
+                    m = person_movies[i]
+
+                    # Every star of a movie is reached at the same depth,
+                    # so each movie only has to be expanded once.
+                    if m in seen_movies:
+                        continue
+                    seen_movies.add(m)
+
+                    for j in range(movie_offsets[m], movie_offsets[m + 1]):
+                        q = movie_stars[j]
+                        if q in parent_person:
+                            continue
+                        parent_person[q] = p
+                        parent_movie[q] = m
+                        if q == target:
+                            return _trace(parent_person, parent_movie, target), expanded
+                        next_layer.append(q)
+            layer = next_layer
+
+        return None, expanded
+
+    def bidirectional_path(self, source, target):
+        """
+        Breadth-first search growing from both `source` and `target`,
+        always expanding whichever frontier layer is smaller. Returns
+        (path, people expanded).
+        """
+        expanded = 0
+        if source == target:
+            return [], expanded
+
+        # Each side: [layer, parent_person, parent_movie, seen_movies]
+        forward = [[source], {source: -1}, {source: -1}, set()]
+        backward = [[target], {target: -1}, {target: -1}, set()]
+
+        while forward[0] and backward[0]:
+            if len(forward[0]) <= len(backward[0]):
+                side, other = forward, backward
+            else:
+                side, other = backward, forward
+
+            expanded += len(side[0])
+            meetings = self._expand_layer(side, other[1])
+
+            # All meetings come from the same layer, but may sit at
+            # different depths on the other side, so keep the shortest.
+            if meetings:
+                best = None
+                for q in meetings:
+                    path = (_trace(forward[1], forward[2], q)
+                            + _trace_back(backward[1], backward[2], q))
+                    if best is None or len(path) < len(best):
+                        best = path
+                return best, expanded
+
+        return None, expanded
+
+    def _expand_layer(self, side, other_parents):
+        """
+        Expands one full BFS layer of `side` in place, returning the
+        newly reached people already reached by the other side.
+        """
+        layer, parent_person, parent_movie, seen_movies = side
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+
+        next_layer = []
+        meetings = []
+        for p in layer:
+            for i in range(person_offsets[p], person_offsets[p + 1]):
+                m = person_movies[i]
+                if m in seen_movies:
+                    continue
+                seen_movies.add(m)
+
+                for j in range(movie_offsets[m], movie_offsets[m + 1]):
+                    q = movie_stars[j]
+                    if q in parent_person:
+                        continue
+                    parent_person[q] = p
+                    parent_movie[q] = m
+                    if q in other_parents:
+                        meetings.append(q)
+                    next_layer.append(q)
+
+        side[0] = next_layer
+        return meetings
+
+    def distances(self, source):
+        """
+        Single-source BFS labelling every person with their degrees of
+        separation from `source` in one pass over the graph.
+
+        Returns an array('h') indexed by person, with -1 for unreachable.
+        """
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+
+        distance = array('h', [-1]) * self.person_count()
+        seen_movies = bytearray(self.movie_count())
+        distance[source] = 0
+        layer = [source]
+        depth = 0
+
+        while layer:
+            depth += 1
+            next_layer = []
+            for p in layer:
+                for i in range(person_offsets[p], person_offsets[p + 1]):
+                    m = person_movies[i]
+                    if seen_movies[m]:
+                        continue
+                    seen_movies[m] = 1
+                    for j in range(movie_offsets[m], movie_offsets[m + 1]):
+                        q = movie_stars[j]
+                        if distance[q] == -1:
+                            distance[q] = depth
+                            next_layer.append(q)
+            layer = next_layer
+
+        return distance
+
+    def components(self):
+        """
+        Labels connected components of the co-star graph.
+
+        Returns an array('i') mapping each person to the smallest person
+        index in their component.
+        """
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+
+        label = array('i', [-1]) * self.person_count()
+        seen_movies = bytearray(self.movie_count())
+
+        for root in range(self.person_count()):
+            if label[root] != -1:
+                continue
+            label[root] = root
+            stack = [root]
+            while stack:
+                p = stack.pop()
+                for i in range(person_offsets[p], person_offsets[p + 1]):
+                    m = person_movies[i]
+                    if seen_movies[m]:
+                        continue
+                    seen_movies[m] = 1
+                    for j in range(movie_offsets[m], movie_offsets[m + 1]):
+                        q = movie_stars[j]
+                        if label[q] == -1:
+                            label[q] = root
+                            stack.append(q)
+
+        return label
+
+    # Views keeping the original dict API of degrees.py
+
+    def people_view(self):
+        return PeopleView(self)
+
+    def movies_view(self):
+        return MoviesView(self)
+
+    def names_view(self):
+        return NamesView(self)
+
+
+class StringTable:
+    """
+    Immutable list of strings packed into one UTF-8 blob plus an offsets
+    array. Pickles as two buffers, so snapshots load without creating a
+    Python object per string.
+    """
+
+    def __init__(self, strings=()):
+        offsets = array('q', [0])
+        chunks = []
+        total = 0
+        for string in strings:
+            chunk = string.encode("utf-8")
+            total += len(chunk)
+            offsets.append(total)
+            chunks.append(chunk)
+        self.offsets = offsets
+        self.blob = b"".join(chunks)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("string table index out of range")
+        return self.blob[self.offsets[i]:self.offsets[i + 1]].decode("utf-8")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+class SortedIndex:
+    """
+    Maps the strings of a StringTable back to their positions using a
+    sorted permutation and binary search, instead of a dict of millions
+    of keys. Assumes the table holds no duplicates.
+
+    `keys` may pass the same strings as a plain list, which sorts much
+    faster than decoding them back out of the table.
+    """
+
+    def __init__(self, table, keys=None):
+        keys = table if keys is None else keys
+        self.table = table
+        self.order = array('i', sorted(range(len(table)), key=keys.__getitem__))
+
+    def __len__(self):
+        return len(self.order)
+
+    def __iter__(self):
+        return iter(self.table)
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __getitem__(self, key):
+        i = self.get(key)
+        if i is None:
+            raise KeyError(key)
+        return i
+
+    def get(self, key, default=None):
+        order = self.order
+        pos = bisect_left(order, key, key=self.table.__getitem__)
+        if pos < len(order) and self.table[order[pos]] == key:
+            return order[pos]
+        return default
+
+
+class GroupIndex:
+    """
+    Maps each distinct string of a StringTable to the sorted list of
+    positions holding it, again by binary search over a sorted permutation.
+    """
+
+    def __init__(self, table, keys=None):
+        keys = table if keys is None else keys
+        self.table = table
+        self.order = array('i', sorted(range(len(table)), key=keys.__getitem__))
+
+    def __contains__(self, key):
+        return bool(self.get(key))
+
+    def __getitem__(self, key):
+        group = self.get(key)
+        if not group:
+            raise KeyError(key)
+        return group
+
+    def __iter__(self):
+        last = None
+        for i in self.order:
+            key = self.table[i]
+            if key != last:
+                yield key
+                last = key
+
+    def get(self, key, default=None):
+        lo, hi = self.range(key)
+        if lo == hi:
+            return default
+        return sorted(self.order[lo:hi])
+
+    def range(self, key):
+        """
+        Returns the [lo, hi) slice of `order` whose strings equal `key`.
+        """
+        lookup = self.table.__getitem__
+        lo = bisect_left(self.order, key, key=lookup)
+        hi = bisect_right(self.order, key, lo=lo, key=lookup)
+        return lo, hi
+
+
+class PeopleView(Mapping):
+    """
+    Maps person_ids to a dictionary of: name, birth, movies (a set of movie_ids)
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, person_id):
+        g = self.graph
+        p = g.person_index[person_id]
+        return {
+            "name": g.person_names[p],
+            "birth": g.person_births[p],
+            "movies": {g.movie_ids[m] for m in g.movies_of(p)}
+        }
+
+    def __contains__(self, person_id):
+        return person_id in self.graph.person_index
+
+    def __iter__(self):
+        return iter(self.graph.person_ids)
+
+    def __len__(self):
+        return len(self.graph.person_ids)
+
+
+class MoviesView(Mapping):
+    """
+    Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, movie_id):
+        g = self.graph
+        m = g.movie_index[movie_id]
+        return {
+            "title": g.movie_titles[m],
+            "year": g.movie_years[m],
+            "stars": {g.person_ids[p] for p in g.stars_of(m)}
+        }
+
+    def __contains__(self, movie_id):
+        return movie_id in self.graph.movie_index
+
+    def __iter__(self):
+        return iter(self.graph.movie_ids)
+
+    def __len__(self):
+        return len(self.graph.movie_ids)
+
+
+class NamesView(Mapping):
+    """
+    Maps lowercase names to a set of corresponding person_ids
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, name):
+        g = self.graph
+        return {g.person_ids[p] for p in g.name_index[name]}
+
+    def __contains__(self, name):
+        return name in self.graph.name_index
+
+    def __iter__(self):
+        return iter(self.graph.name_index)
+
+    def __len__(self):
+        return sum(1 for name in self.graph.name_index)
+
+
+def _csr(rows, cols, size):
+    """
+    Counting sort of (row, col) pairs into CSR offsets and column arrays.
+    """
+    offsets = array('i', [0]) * (size + 1)
+    for r in rows:
+        offsets[r + 1] += 1
+    for i in range(size):
+        offsets[i + 1] += offsets[i]
+
+    fill = array('i', offsets)
+    values = array('i', [0]) * len(cols)
+    for r, c in zip(rows, cols):
+        values[fill[r]] = c
+        fill[r] += 1
+
+    return offsets, values
+
+
+def _load_or_build(path, directory, version, build):
+    """
+    Returns the state dict pickled at `path` if it was saved with `version`
+    from the CSV files in `directory` as they are now. Otherwise calls
+    build() for a fresh state dict and saves it there, stamped with both,
+    ignoring a directory that can't be written to.
+    """
+    try:
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        if state.get("version") == version and _sources_match(state["sources"], directory):
+            return state
+    except (OSError, pickle.UnpicklingError, EOFError, KeyError, AttributeError):
+        pass
+
+    state = build()
+    state["version"] = version
+    state["sources"] = _fingerprints(directory)
+
+    # Write then rename, so a crash never leaves half a file behind
+    try:
+        temp = path + ".tmp"
+        with open(temp, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp, path)
+    except OSError:
+        pass
+    return state
+
+
+def _fingerprints(directory):
+    """
+    Returns {filename: (size, mtime_ns, sha1)} for the CSV sources.
+    """
+    fingerprints = {}
+    for name in SOURCES:
+        path = os.path.join(directory, name)
+        info = os.stat(path)
+        fingerprints[name] = (info.st_size, info.st_mtime_ns, _sha1(path))
+    return fingerprints
+
+
+def _sources_match(fingerprints, directory):
+    """
+    Checks recorded fingerprints against the CSV files on disk. Files whose
+    size and mtime are unchanged are trusted; otherwise the content hash
+    decides, so merely touching a file doesn't throw the snapshot away.
+    """
+    for name in SOURCES:
+        path = os.path.join(directory, name)
+        try:
+            info = os.stat(path)
+        except OSError:
+            return False
+        size, mtime, digest = fingerprints.get(name, (None, None, None))
+        if info.st_size != size:
+            return False
+        if info.st_mtime_ns != mtime and _sha1(path) != digest:
+            return False
+    return True
+
+
+def _sha1(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _trace(parent_person, parent_movie, target):
+    """
+    Follows parent pointers back from `target` into (movie, person) pairs.
+    """
+    path = []
+    p = target
+    while parent_person[p] != -1:
+        path.append((parent_movie[p], p))
+        p = parent_person[p]
+    path.reverse()
+    return path
+
+
+def _trace_back(parent_person, parent_movie, meeting):
+    """
+    Follows backward-search parent pointers from `meeting` to the target,
+    returning the (movie, person) pairs after `meeting`.
+    """
+    path = []
+    p = meeting
+    while parent_person[p] != -1:
+        path.append((parent_movie[p], parent_person[p]))
+        p = parent_person[p]
+    return path
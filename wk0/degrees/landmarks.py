@@ -0,0 +1,205 @@
+"""
+Landmark (ALT) distance index for the degrees co-star graph.
+
+BFS distances from a handful of landmark actors give, by the triangle
+inequality, a lower bound on the separation between any two people:
+
+    d(u, t) >= max over landmarks L of |d(L, u) - d(L, t)|
+
+and the path through the best landmark gives an upper bound. The search
+is a bidirectional BFS, like CoStarGraph.bidirectional_path, that skips
+anyone whose depth plus lower bound to the other end exceeds the upper
+bound, since no shortest path can go through them.
+
+On this unit-weight, small-world graph a bidirectional BFS already meets
+after a couple of dozen people, so the bounds only trim it a little: on
+`python benchmark.py random 300` both expand ~17 people and take ~0.3 ms
+a query. A one-sided A* on the same bounds, tried first, expanded ~300
+and took ~20 ms. What the index does add is proving two people apart
+without searching, when a landmark reaches one and not the other. It is
+stored next to the graph snapshot and rebuilt with it.
+"""
+
+import os
+
+from graph import _load_or_build, _trace, _trace_back
+
+# Bump whenever the index layout changes
+INDEX_VERSION = 1
+INDEX_NAME = "landmarks.pickle"
+LANDMARKS = 8
+
+
+class LandmarkIndex:
+    def __init__(self, graph, landmarks, rows):
+        self.graph = graph
+        self.landmarks = landmarks
+        # rows[i][p] is the distance from landmarks[i] to person p, or -1
+        self.rows = rows
+
+    @classmethod
+    def build(cls, graph, k=LANDMARKS):
+        """
+        Picks `k` landmarks and runs a BFS from each.
+
+        The first landmark is the best connected actor (most movies). Each
+        next one is the actor farthest from all landmarks so far, ties going
+        to the better connected, which spreads the landmarks around the
+        edges of the graph where their bounds are tightest.
+        """
+        count = graph.person_count()
+        if count == 0:
+            return cls(graph, [], [])
+
+        offsets = graph.person_offsets
+        movies = [offsets[p + 1] - offsets[p] for p in range(count)]
+        landmarks = [max(range(count), key=movies.__getitem__)]
+        rows = [graph.distances(landmarks[0])]
+
+        # Distance from each person to its closest landmark so far
+        closest = list(rows[0])
+        while len(landmarks) < min(k, count):
+            best = max(range(count), key=lambda p: (closest[p], movies[p]))
+            if closest[best] <= 0:
+                break
+            landmarks.append(best)
+            row = graph.distances(best)
+            rows.append(row)
+            for p in range(count):
+                if row[p] != -1 and (closest[p] == -1 or row[p] < closest[p]):
+                    closest[p] = row[p]
+
+        return cls(graph, landmarks, rows)
+
+    @classmethod
+    def load_cached(cls, graph, directory, k=LANDMARKS):
+        """
+        Loads the index stored next to the snapshot in `directory` if it is
+        still valid for the CSV sources and `k`, building (and saving) it
+        otherwise.
+        """
+        def build():
+            index = cls.build(graph, k)
+            return {"landmarks": index.landmarks, "rows": index.rows}
+
+        state = _load_or_build(os.path.join(directory, INDEX_NAME), directory,
+                               (INDEX_VERSION, k), build)
+        return cls(graph, state["landmarks"], state["rows"])
+
+    def lower_bound(self, target):
+        """
+        Returns a function giving a lower bound on the separation between
+        any person and `target`.
+        """
+        # Only landmarks that reach the target carry any information
+        useful = [(row, row[target]) for row in self.rows if row[target] != -1]
+
+        def bound(p):
+            best = 0
+            for row, dt in useful:
+                d = row[p] - dt
+                if d < 0:
+                    d = -d
+                if d > best:
+                    best = d
+            return best
+
+        return bound
+
+    def upper_bound(self, source, target):
+        """
+        Returns the length of the shortest path between `source` and
+        `target` through a landmark, or None if no landmark reaches both.
+        """
+        lengths = [row[source] + row[target] for row in self.rows
+                   if row[source] != -1 and row[target] != -1]
+        return min(lengths) if lengths else None
+
+    def shortest_path(self, source, target):
+        """
+        Landmark-pruned bidirectional BFS between person indices `source`
+        and `target`.
+
+        Returns (path, people expanded), where path is a list of (movie,
+        person) index pairs, or None if the two people are not connected.
+        """
+        expanded = 0
+        if source == target:
+            return [], expanded
+
+        # A landmark reaching exactly one of the two proves they're apart
+        for row in self.rows:
+            if (row[source] == -1) != (row[target] == -1):
+                return None, expanded
+
+        upper = self.upper_bound(source, target)
+
+        # Each side: [layer, parent_person, parent_movie, seen_movies,
+        # depth, lower bound to the other end]
+        forward = [[source], {source: -1}, {source: -1}, set(), 0, self.lower_bound(target)]
+        backward = [[target], {target: -1}, {target: -1}, set(), 0, self.lower_bound(source)]
+
+        while forward[0] and backward[0]:
+            if len(forward[0]) <= len(backward[0]):
+                side, other = forward, backward
+            else:
+                side, other = backward, forward
+
+            meetings, count = self._expand_layer(side, other[1], upper)
+            expanded += count
+
+            # As in CoStarGraph.bidirectional_path, keep the shortest meeting
+            if meetings:
+                best = None
+                for q in meetings:
+                    path = (_trace(forward[1], forward[2], q)
+                            + _trace_back(backward[1], backward[2], q))
+                    if best is None or len(path) < len(best):
+                        best = path
+                return best, expanded
+
+        return None, expanded
+
+    def _expand_layer(self, side, other_parents, upper):
+        """
+        Expands one BFS layer of `side` in place, like
+        CoStarGraph._expand_layer, but skips people whose depth plus lower
+        bound to the other end exceeds `upper`: no shortest path goes
+        through them. Bounds are only worked out for the people expanded,
+        far fewer than those reached. Returns the meetings with the other
+        side and the number of people expanded.
+        """
+        layer, parent_person, parent_movie, seen_movies, depth, bound = side
+        graph = self.graph
+        person_offsets = graph.person_offsets
+        person_movies = graph.person_movies
+        movie_offsets = graph.movie_offsets
+        movie_stars = graph.movie_stars
+        limit = None if upper is None else upper - depth
+
+        next_layer = []
+        meetings = []
+        expanded = 0
+        for p in layer:
+            if limit is not None and bound(p) > limit:
+                continue
+            expanded += 1
+            for i in range(person_offsets[p], person_offsets[p + 1]):
+                m = person_movies[i]
+                if m in seen_movies:
+                    continue
+                seen_movies.add(m)
+
+                for j in range(movie_offsets[m], movie_offsets[m + 1]):
+                    q = movie_stars[j]
+                    if q in parent_person:
+                        continue
+                    parent_person[q] = p
+                    parent_movie[q] = m
+                    if q in other_parents:
+                        meetings.append(q)
+                    next_layer.append(q)
+
+        side[0] = next_layer
+        side[4] = depth + 1
+        return meetings, expanded
@@ -0,0 +1,163 @@
+"""
+Prefix and fuzzy name lookup for the degrees co-star graph.
+
+Prefix matches come straight from the graph's sorted name index. Fuzzy
+matches use a trigram index over the distinct lowercase names to pick a
+few hundred candidates, which are then ranked by edit distance, so a
+misspelt name never needs a linear scan over every person.
+"""
+
+import os
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+from graph import StringTable, _load_or_build
+
+# Bump whenever the index layout changes
+INDEX_VERSION = 1
+INDEX_NAME = "names.pickle"
+
+# Candidates kept from the trigram vote before ranking by edit distance
+CANDIDATES = 200
+# Trigrams shared by more names than this are skipped while voting, as
+# long as a rarer trigram of the query already produced candidates
+COMMON = 50000
+
+
+class NameIndex:
+    def __init__(self, graph, directory=None):
+        self.graph = graph
+        self.directory = directory
+
+        # Built or loaded on first fuzzy search, by one thread at a time
+        self.keys = None
+        self.postings = None
+        self.lock = threading.Lock()
+
+    def prefix(self, text, limit=10):
+        """
+        Returns up to `limit` distinct lowercase names starting with `text`.
+        """
+        text = text.lower()
+        index = self.graph.name_index
+        order = index.order
+        lookup = index.table.__getitem__
+
+        matches = []
+        pos = bisect_left(order, text, key=lookup)
+        while pos < len(order) and len(matches) < limit:
+            name = lookup(order[pos])
+            if not name.startswith(text):
+                break
+            if not matches or matches[-1] != name:
+                matches.append(name)
+            pos += 1
+        return matches
+
+    def search(self, text, limit=5):
+        """
+        Returns up to `limit` (name, person indices) pairs ranked by how
+        closely the name matches `text`: exact match, then prefix matches,
+        then by edit distance.
+        """
+        text = text.lower().strip()
+        if not text:
+            return []
+        self.ensure()
+
+        candidates = set(self.prefix(text, limit))
+
+        # Rare trigrams say more about a name than common ones, so each
+        # vote is weighted by how few names share the trigram.
+        votes = Counter()
+        grams = sorted(_trigrams(text), key=lambda g: len(self.postings.get(g, ())))
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if posting is None:
+                continue
+            if len(posting) > COMMON and votes:
+                break
+            weight = 1 / len(posting)
+            for key in posting:
+                votes[key] += weight
+        for key, _ in votes.most_common(CANDIDATES):
+            candidates.add(self.keys[key])
+
+        # Drop fuzzy candidates too far from the query to be a typo
+        cutoff = max(2, len(text) // 3)
+
+        def rank(name):
+            if name == text:
+                return (0, 0, name)
+            if name.startswith(text):
+                return (1, len(name), name)
+            return (2, _edit_distance(text, name), name)
+
+        ranked = [name for name in sorted(candidates, key=rank)
+                  if name.startswith(text) or _edit_distance(text, name) <= cutoff]
+        return [(name, self.graph.name_index[name]) for name in ranked[:limit]]
+
+    def ensure(self):
+        """
+        Loads the trigram index from next to the snapshot, or builds it.
+        Safe to call from several server threads at once.
+        """
+        with self.lock:
+            if self.postings is not None:
+                return
+            if self.directory is None:
+                self.build()
+                return
+
+            def build():
+                self.build()
+                return {"keys": self.keys, "postings": self.postings}
+
+            state = _load_or_build(os.path.join(self.directory, INDEX_NAME), self.directory,
+                                   INDEX_VERSION, build)
+            self.keys = state["keys"]
+            self.postings = state["postings"]
+
+    def build(self):
+        """
+        Indexes every distinct lowercase name by its trigrams.
+        """
+        keys = list(self.graph.name_index)
+        postings = {}
+        for key, name in enumerate(keys):
+            for gram in _trigrams(name):
+                posting = postings.get(gram)
+                if posting is None:
+                    posting = postings[gram] = array('i')
+                posting.append(key)
+
+        self.keys = StringTable(keys)
+        self.postings = postings
+
+
+def _trigrams(name):
+    """
+    Returns the set of trigrams of `name`, padded so short names and word
+    boundaries still produce some.
+    """
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _edit_distance(a, b):
+    """
+    Levenshtein distance between strings `a` and `b`.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1,
+                               current[j - 1] + 1,
+                               previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
@@ -0,0 +1,69 @@
+"""
+Long-lived HTTP query server for degrees.py.
+
+Keeps the graph loaded and answers shortest path queries from many clients
+at once:
+
+    GET /path?source=Kevin+Bacon&target=Tom+Hanks[&algorithm=bidirectional]
+
+Responses are the JSON produced by `query` (degrees.query), including the per-query
+latency in milliseconds, which is also logged.
+"""
+
+import json
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != "/path":
+            self.reply(404, {"error": "unknown endpoint, use /path"})
+            return
+
+        params = parse_qs(url.query)
+        source = params.get("source", [None])[0]
+        target = params.get("target", [None])[0]
+        algorithm = params.get("algorithm", [self.server.algorithm])[0]
+        if source is None or target is None:
+            self.reply(400, {"error": "source and target are required"})
+            return
+
+        try:
+            answer = self.server.query(source, target, algorithm)
+        except Exception as e:
+            self.reply(400, {"error": str(e)})
+            return
+        self.log_message("query %r -> %r took %.3f ms", source, target, answer["ms"])
+        self.reply(200 if "error" not in answer else 404, answer)
+
+    def reply(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        sys.stderr.write(f"{self.address_string()} {format % args}\n")
+
+
+def serve(port, query, algorithm="bfs", host="127.0.0.1"):
+    """
+    Serves queries with `query(source, target, algorithm)`, normally
+    degrees.query over the already loaded graph, until interrupted.
+    `algorithm` is used when a request doesn't name one.
+    """
+    server = ThreadingHTTPServer((host, port), QueryHandler)
+    server.query = query
+    server.algorithm = algorithm
+    print(f"Serving on http://{host}:{port}/path?source=...&target=...")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,141 @@
+"""
+Whole-graph statistics for the degrees co-star graph.
+
+Usage: python stats.py directory [--hub NAME] [--sources N|all]
+                                 [--workers N] [--output FILE]
+
+Prints a degrees-of-separation histogram from a hub actor (a "Kevin Bacon
+number" table) and the connected components, then runs single-source BFS
+from many people across a process pool. Each source's eccentricity is
+reported and its distances are written to a compact distance table.
+"""
+
+import argparse
+import os
+import random
+import struct
+import sys
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from graph import CoStarGraph
+
+# Distance table layout: magic, people, sources, then the source indices
+# as int32 and one int16 distance row per source (-1 = unreachable),
+# all in native byte order.
+TABLE_MAGIC = b"DEGDIST1"
+SEED = 50
+
+# The graph each pool worker loads once in its initializer
+_graph = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Co-star graph statistics.")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--hub", default="Kevin Bacon",
+                        help="name of the actor to measure separation from")
+    parser.add_argument("--sources", default="100",
+                        help="number of random sources for eccentricities, or 'all'")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="processes used for the multi-source BFS")
+    parser.add_argument("--output", default="distances.bin",
+                        help="where to write the distance table")
+    args = parser.parse_args()
+
+    graph = CoStarGraph()
+    graph.load_cached(args.directory)
+
+    # Separation histogram from the hub
+    hubs = graph.name_index.get(args.hub.lower())
+    if not hubs:
+        sys.exit(f"Person not found: {args.hub}")
+    print(f"Degrees of separation from {args.hub}:")
+    for depth, count in histogram(graph.distances(hubs[0])):
+        print(f"  {'unreachable' if depth == -1 else depth:>11}: {count}")
+
+    # Connected components
+    sizes = sorted(Counter(graph.components()).values(), reverse=True)
+    print(f"{len(sizes)} connected components, largest: {sizes[:5]}")
+
+    # Eccentricities and distance table from many sources
+    if args.sources == "all":
+        sources = list(range(graph.person_count()))
+    else:
+        count = min(int(args.sources), graph.person_count())
+        sources = random.Random(SEED).sample(range(graph.person_count()), count)
+
+    rows = distance_rows(args.directory, sources, args.workers)
+    eccentricities = write_table(args.output, graph.person_count(), sources, rows)
+
+    print(f"Distance table for {len(sources)} sources written to {args.output}")
+    widest = sorted(zip(eccentricities, sources), reverse=True)[:5]
+    for eccentricity, source in widest:
+        print(f"  {graph.person_names[source]}: eccentricity {eccentricity}")
+
+
+def histogram(distance):
+    """
+    Returns sorted (distance, people) pairs, unreachable people as -1.
+    """
+    return sorted(Counter(distance).items())
+
+
+def distance_rows(directory, sources, workers):
+    """
+    Yields (eccentricity, distance row bytes) per source, in order, fanning
+    the BFS runs out over a process pool.
+    """
+    with ProcessPoolExecutor(max_workers=workers, initializer=_load_worker,
+                             initargs=(directory,)) as pool:
+        chunksize = max(1, len(sources) // (4 * (workers or 1)))
+        yield from pool.map(_distances_from, sources, chunksize=chunksize)
+
+
+def write_table(path, people, sources, rows):
+    """
+    Streams `rows` into a distance table at `path`, returning the
+    eccentricity of each source.
+    """
+    eccentricities = []
+    with open(path, "wb") as f:
+        f.write(TABLE_MAGIC + struct.pack("ii", people, len(sources)))
+        f.write(array('i', sources).tobytes())
+        for eccentricity, row in rows:
+            eccentricities.append(eccentricity)
+            f.write(row)
+    return eccentricities
+
+
+def read_table(path):
+    """
+    Reads a distance table back into (sources, {source: array('h')}).
+    """
+    with open(path, "rb") as f:
+        if f.read(len(TABLE_MAGIC)) != TABLE_MAGIC:
+            raise Exception(f"Not a distance table: {path}")
+        people, count = struct.unpack("ii", f.read(8))
+        sources = array('i')
+        sources.frombytes(f.read(4 * count))
+        table = {}
+        for source in sources:
+            row = array('h')
+            row.frombytes(f.read(2 * people))
+            table[source] = row
+    return list(sources), table
+
+
+def _load_worker(directory):
+    global _graph
+    _graph = CoStarGraph()
+    _graph.load_cached(directory)
+
+
+def _distances_from(source):
+    distance = _graph.distances(source)
+    return max(distance), distance.tobytes()
+
+
+if __name__ == "__main__":
+    main()
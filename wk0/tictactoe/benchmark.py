@@ -0,0 +1,113 @@
+"""
+Compares nodes searched by the Tic Tac Toe search helpers.
+
+Usage: python benchmark.py
+
+First plays one game with minimax from the empty board and, for each move,
+reports how many positions _poweredUpHelper and _negamax visit to value
+the position. Then totals both over every reachable position. Each
+_negamax call starts with empty move ordering tables, so earlier searches
+don't help later ones.
+"""
+
+import time
+
+import tictactoe as ttt
+
+HELPERS = ["_poweredUpHelper", "_negamax"]
+
+
+def count_calls(module, name):
+    """
+    Wraps module.<name> so that every call, the recursive ones included,
+    is counted in the returned one-element list.
+    """
+    function = getattr(module, name)
+    calls = [0]
+
+    def counted(*args):
+        calls[0] += 1
+        return function(*args)
+
+    setattr(module, name, counted)
+    return calls
+
+
+def search(board, powered_calls):
+    """
+    Values `board` with each helper, returning
+    {helper: (value for X, nodes, seconds)}.
+    """
+    results = {}
+
+    start = time.perf_counter()
+    powered_calls[0] = 0
+    value = ttt._poweredUpHelper(board)
+    results["_poweredUpHelper"] = (value, powered_calls[0], time.perf_counter() - start)
+
+    start = time.perf_counter()
+    ttt.nodes = 0
+    value = ttt._negamax(board)
+    if ttt.player(board) == ttt.O:
+        value = -value
+    results["_negamax"] = (value, ttt.nodes, time.perf_counter() - start)
+
+    values = {value for value, _, _ in results.values()}
+    if len(values) != 1:
+        raise Exception('Helpers disagree on ' + str(board))
+    return results
+
+
+def main():
+    powered_calls = count_calls(ttt, "_poweredUpHelper")
+
+    print("One game of minimax self-play")
+    print(f"{'move':>5}{'player':>8}" + "".join(f"{name:>20}" for name in HELPERS))
+    board = ttt.initial_state()
+    ttt.reset_search()
+    move = 1
+    while not ttt.terminal(board):
+        results = search(board, powered_calls)
+        print(f"{move:>5}{ttt.player(board):>8}"
+              + "".join(f"{results[name][1]:>20}" for name in HELPERS))
+        board = ttt.result(board, ttt.minimax(board))
+        move += 1
+
+    print()
+    print("Every reachable position")
+    totals = {name: [0, 0.0] for name in HELPERS}
+    positions = 0
+    for board in reachable():
+        ttt.reset_search()
+        for name, (_, nodes, seconds) in search(board, powered_calls).items():
+            totals[name][0] += nodes
+            totals[name][1] += seconds
+        positions += 1
+
+    print(f"{'helper':<20}{'nodes':>12}{'per position':>16}{'seconds':>10}")
+    for name in HELPERS:
+        nodes, seconds = totals[name]
+        print(f"{name:<20}{nodes:>12}{nodes / positions:>16.1f}{seconds:>10.2f}")
+    print(f"{positions} positions, _negamax visits "
+          f"{totals['_negamax'][0] / totals['_poweredUpHelper'][0]:.1%} of the nodes")
+
+
+def reachable():
+    """
+    Yields every non-terminal position reachable from the empty board once.
+    """
+    seen = set()
+    stack = [ttt.initial_state()]
+    while stack:
+        board = stack.pop()
+        key = tuple(map(tuple, board))
+        if key in seen or ttt.terminal(board):
+            continue
+        seen.add(key)
+        yield board
+        for action in ttt.actions(board):
+            stack.append(ttt.result(board, action))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Bitboard Tic Tac Toe engine.
+
+A position is two 9-bit masks, one per player, with cell (i, j) at bit
+3 * i + j. Wins are looked up in a precomputed 512-entry table, and solved
+positions go into a transposition table keyed on the canonical form of the
+position under the 8 rotations and reflections of the board.
+"""
+
+X = "X"
+O = "O"
+
+# The 8 winning lines as bitmasks
+LINES = [
+    0b000000111, 0b000111000, 0b111000000,  # Rows
+    0b001001001, 0b010010010, 0b100100100,  # Columns
+    0b100010001, 0b001010100,               # Diagonals
+]
+
+FULL = 0b111111111
+
+# WINS[mask] is True if mask contains a complete line
+WINS = [any(mask & line == line for line in LINES) for mask in range(512)]
+
+
+def _symmetries():
+    """
+    Returns the 8 board symmetries as cell permutations: cell k moves to
+    cell perm[k].
+    """
+    def rotate(i, j):
+        return j, 2 - i
+
+    def reflect(i, j):
+        return i, 2 - j
+
+    perms = []
+    for flip in (False, True):
+        for turns in range(4):
+            perm = []
+            for k in range(9):
+                i, j = divmod(k, 3)
+                if flip:
+                    i, j = reflect(i, j)
+                for _ in range(turns):
+                    i, j = rotate(i, j)
+                perm.append(3 * i + j)
+            perms.append(perm)
+    return perms
+
+
+SYMMETRIES = _symmetries()
+
+# TRANSFORMS[s][mask] is mask with symmetry s applied
+TRANSFORMS = [
+    [sum(1 << perm[k] for k in range(9) if mask >> k & 1) for mask in range(512)]
+    for perm in SYMMETRIES
+]
+
+# Canonical position -> value for the player to move (1 win, 0 draw, -1 loss)
+table = {}
+
+
+def encode(board):
+    """
+    Returns the (x, o) masks of a list-of-lists board.
+    """
+    x = o = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == X:
+                x |= 1 << (3 * i + j)
+            elif board[i][j] == O:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
+def canonical(me, them):
+    """
+    Smallest key among the 8 symmetric images of the position.
+    """
+    return min((t[me] << 9) | t[them] for t in TRANSFORMS)
+
+
+def negamax(me, them):
+    """
+    Value of the position for the player to move, whose stones are `me`.
+    """
+    if WINS[them]:
+        return -1
+    if me | them == FULL:
+        return 0
+
+    key = canonical(me, them)
+    value = table.get(key)
+    if value is not None:
+        return value
+
+    value = -1
+    free = FULL & ~(me | them)
+    while free:
+        move = free & -free
+        free ^= move
+        score = -negamax(them, me | move)
+        if score > value:
+            value = score
+            if value == 1:
+                break
+
+    table[key] = value
+    return value
+
+
+def value(board):
+    """
+    Returns the minimax value of a board: 1 if X wins with best play,
+    -1 if O does, 0 for a draw, matching tictactoe.utility.
+    """
+    x, o = encode(board)
+    if bin(x).count("1") > bin(o).count("1"):
+        return -negamax(o, x)
+    return negamax(x, o)
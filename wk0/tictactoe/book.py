@@ -0,0 +1,112 @@
+"""
+Precomputed opening book for Tic Tac Toe.
+
+Up to rotation and reflection there are only 765 reachable positions, so
+all of them are solved once and written to book.bin. Each entry packs the
+18-bit canonical position key (see bitboard.canonical) and the position's
+value for X into 3 bytes, about 2KB for the whole game.
+
+Usage: python book.py [path]
+"""
+
+import os
+import sys
+
+import bitboard
+
+BOOK_MAGIC = b"TTTBOOK1"
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+
+# Canonical key -> value for X, or None if the book isn't loaded (yet)
+entries = None
+
+
+def generate():
+    """
+    Solves every reachable position and returns {canonical key: value},
+    where value is 1 if X wins with best play, -1 if O does, 0 for a draw.
+    """
+    book = {}
+
+    def visit(x, o, x_to_move):
+        key = bitboard.canonical(x, o)
+        if key in book:
+            return
+        if x_to_move:
+            book[key] = bitboard.negamax(x, o)
+        else:
+            book[key] = -bitboard.negamax(o, x)
+
+        if bitboard.WINS[x] or bitboard.WINS[o]:
+            return
+        free = bitboard.FULL & ~(x | o)
+        while free:
+            move = free & -free
+            free ^= move
+            if x_to_move:
+                visit(x | move, o, False)
+            else:
+                visit(x, o | move, True)
+
+    visit(0, 0, True)
+    return book
+
+
+def write(book, path=BOOK_PATH):
+    """
+    Writes a book to `path`, via a temporary file so a half-written book
+    is never picked up.
+    """
+    data = bytearray(BOOK_MAGIC)
+    for key in sorted(book):
+        data += ((key << 2) | (book[key] + 1)).to_bytes(3, "little")
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def read(path=BOOK_PATH):
+    """
+    Reads a book written by write(), or returns None if it is missing
+    or doesn't look like one.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+
+    body = data[len(BOOK_MAGIC):]
+    if not data.startswith(BOOK_MAGIC) or len(body) % 3:
+        return None
+
+    book = {}
+    for i in range(0, len(body), 3):
+        packed = int.from_bytes(body[i:i + 3], "little")
+        book[packed >> 2] = (packed & 3) - 1
+    return book
+
+
+def value(board):
+    """
+    Returns the minimax value of a board for X, from the book when there
+    is one and by searching otherwise.
+    """
+    global entries
+    if entries is None:
+        entries = read() or {}
+
+    x, o = bitboard.encode(board)
+    result = entries.get(bitboard.canonical(x, o))
+    if result is None:
+        return bitboard.value(board)
+    return result
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else BOOK_PATH
+    book = generate()
+    write(book, path)
+    print(f"Wrote {len(book)} positions to {path}")
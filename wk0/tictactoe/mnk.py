@@ -0,0 +1,393 @@
+"""
+m,n,k-game engine: m rows, n columns, k in a row wins. Tic Tac Toe is the
+3,3,3 game, gomoku is 15,15,5.
+
+The board keeps, for every length-k window (line segment a win could use),
+how many stones each player has in it. Placing or removing a stone only
+touches the windows through that cell, which gives win detection around
+the last move and an incrementally updated evaluation for free.
+
+The search is iterative-deepening negamax with alpha-beta pruning, a
+transposition table on Zobrist hashes, and move ordering (table move,
+killer moves, history and a threat score). It stops when the per-move
+time budget runs out and plays the best move of the last finished depth.
+
+Usage: python mnk.py [m n k] [--budget SECONDS]
+"""
+
+import argparse
+import random
+import time
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# Scores beyond WIN - MAX_PLY are forced wins, with the distance encoded
+WIN = 1 << 60
+MAX_PLY = 1024
+
+# Transposition table flags
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# How often (in nodes) the search looks at the clock
+CHECK_EVERY = 256
+
+
+class TimeUp(Exception):
+    pass
+
+
+class Game:
+    def __init__(self, m, n, k, seed=0):
+        self.m = m
+        self.n = n
+        self.k = k
+        self.cells = [EMPTY] * (m * n)
+
+        # Every window of k cells in a row, and the windows through each cell
+        self.windows = []
+        self.through = [[] for _ in range(m * n)]
+        for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            for r in range(m):
+                for c in range(n):
+                    end_r, end_c = r + dr * (k - 1), c + dc * (k - 1)
+                    if 0 <= end_r < m and 0 <= end_c < n:
+                        window = len(self.windows)
+                        self.windows.append([(r + dr * t) * n + c + dc * t for t in range(k)])
+                        for cell in self.windows[-1]:
+                            self.through[cell].append(window)
+        self.counts = {X: [0] * len(self.windows), O: [0] * len(self.windows)}
+
+        # A window with c of one player's stones and none of the other's
+        # is worth weights[c] to that player
+        self.weights = [0] + [4 ** c for c in range(k)]
+
+        # Cells within two steps of each cell, for picking candidate moves
+        self.around = [[rr * n + cc
+                        for rr in range(max(0, r - 2), min(m, r + 3))
+                        for cc in range(max(0, c - 2), min(n, c + 3))
+                        if (rr, cc) != (r, c)]
+                       for r in range(m) for c in range(n)]
+        self.near = [0] * (m * n)
+
+        rng = random.Random(seed)
+        self.zobrist = {X: [rng.getrandbits(64) for _ in range(m * n)],
+                        O: [rng.getrandbits(64) for _ in range(m * n)]}
+
+        self.hash = 0
+        self.score = 0      # Evaluation for X
+        self.stones = {X: 0, O: 0}
+        self.winner = None
+        self.history = []   # (cell, winner before the move)
+
+    @classmethod
+    def from_lists(cls, board, k=3):
+        """
+        Builds a game from a list-of-lists board of X, O and EMPTY, like
+        the ones tictactoe.py uses.
+        """
+        game = cls(len(board), len(board[0]), k)
+        for i, row in enumerate(board):
+            for j, cell in enumerate(row):
+                if cell is not EMPTY:
+                    game._place(i * game.n + j, cell)
+        game.history = []
+        return game
+
+    def player(self):
+        return X if self.stones[X] == self.stones[O] else O
+
+    def full(self):
+        return self.stones[X] + self.stones[O] == len(self.cells)
+
+    def terminal(self):
+        return self.winner is not None or self.full()
+
+    def play(self, cell):
+        """
+        Places the next player's stone on `cell` (row * n + col).
+        """
+        if self.cells[cell] is not EMPTY or self.winner is not None:
+            raise Exception('Invalid Action Attempted: ' + str(divmod(cell, self.n)))
+        self.history.append((cell, self.winner))
+        self._place(cell, self.player())
+
+    def undo(self):
+        cell, winner = self.history.pop()
+        player = self.cells[cell]
+        mine = self.counts[player]
+        x_counts, o_counts = self.counts[X], self.counts[O]
+
+        for window in self.through[cell]:
+            self.score -= self._value(x_counts[window], o_counts[window])
+            mine[window] -= 1
+            self.score += self._value(x_counts[window], o_counts[window])
+        for j in self.around[cell]:
+            self.near[j] -= 1
+
+        self.cells[cell] = EMPTY
+        self.stones[player] -= 1
+        self.hash ^= self.zobrist[player][cell]
+        self.winner = winner
+
+    def evaluate(self):
+        """
+        Static evaluation for the player to move.
+        """
+        return self.score if self.player() == X else -self.score
+
+    def moves(self):
+        """
+        Empty cells worth considering: all of them on small boards, those
+        near existing stones on big ones.
+        """
+        if len(self.cells) <= 25:
+            return [i for i, cell in enumerate(self.cells) if cell is EMPTY]
+        if not self.stones[X] and not self.stones[O]:
+            return [(self.m // 2) * self.n + self.n // 2]
+        return [i for i, cell in enumerate(self.cells) if cell is EMPTY and self.near[i]]
+
+    def threat(self, cell):
+        """
+        How much playing `cell` extends the mover's lines and blocks the
+        opponent's, used for move ordering.
+        """
+        player = self.player()
+        other = O if player == X else X
+        mine, theirs = self.counts[player], self.counts[other]
+        weights = self.weights
+        total = 0
+        for window in self.through[cell]:
+            if not theirs[window]:
+                total += weights[mine[window] + 1]
+            if not mine[window]:
+                total += weights[theirs[window] + 1]
+        return total
+
+    def _place(self, cell, player):
+        mine = self.counts[player]
+        x_counts, o_counts = self.counts[X], self.counts[O]
+
+        for window in self.through[cell]:
+            self.score -= self._value(x_counts[window], o_counts[window])
+            mine[window] += 1
+            self.score += self._value(x_counts[window], o_counts[window])
+            if mine[window] == self.k:
+                self.winner = player
+        for j in self.around[cell]:
+            self.near[j] += 1
+
+        self.cells[cell] = player
+        self.stones[player] += 1
+        self.hash ^= self.zobrist[player][cell]
+
+    def _value(self, x, o):
+        # What one window is worth to X; windows both players use are dead
+        if not o:
+            return self.weights[x]
+        if not x:
+            return -self.weights[o]
+        return 0
+
+    def __str__(self):
+        return "\n".join(" ".join(cell or "." for cell in self.cells[r * self.n:(r + 1) * self.n])
+                         for r in range(self.m))
+
+
+class Search:
+    def __init__(self, game):
+        self.game = game
+        self.table = {}
+        self.history = [0] * len(game.cells)
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        self.nodes = 0
+        self.depth = 0
+        self.score = 0
+        self.deadline = None
+
+    def best_move(self, budget=1.0, max_depth=None):
+        """
+        Searches deeper and deeper until `budget` seconds have passed, and
+        returns the best cell of the last depth that finished, or None if
+        the game is over.
+        """
+        game = self.game
+        if game.terminal():
+            return None
+
+        self.deadline = time.perf_counter() + budget
+        self.nodes = 0
+        remaining = len(game.cells) - game.stones[X] - game.stones[O]
+        if max_depth is None:
+            max_depth = remaining
+        max_depth = min(max_depth, remaining)
+
+        moves = self._ordered(game.moves(), None, 0)
+        best = moves[0]
+        for depth in range(1, max_depth + 1):
+            try:
+                move, score = self._root(moves, depth)
+            except TimeUp:
+                break
+            best = move
+            self.depth = depth
+            self.score = score
+
+            # Search the principal move first next time round
+            moves.remove(move)
+            moves.insert(0, move)
+
+            if abs(score) >= WIN - MAX_PLY:
+                break
+        return best
+
+    def _root(self, moves, depth):
+        game = self.game
+        alpha = -WIN
+        best = moves[0]
+        for cell in moves:
+            game.play(cell)
+            try:
+                value = -self._negamax(depth - 1, -WIN, -alpha, 1)
+            finally:
+                game.undo()
+            if value > alpha:
+                alpha = value
+                best = cell
+        return best, alpha
+
+    def _negamax(self, depth, alpha, beta, ply):
+        self.nodes += 1
+        if not self.nodes % CHECK_EVERY and time.perf_counter() > self.deadline:
+            raise TimeUp()
+
+        game = self.game
+        if game.winner is not None:
+            # The previous player just won
+            return -(WIN - ply)
+        if game.full():
+            return 0
+        if depth == 0:
+            return game.evaluate()
+
+        start_alpha = alpha
+        table_move = None
+        entry = self.table.get(game.hash)
+        if entry is not None:
+            entry_depth, flag, value, table_move = entry
+            value = _from_table(value, ply)
+            if entry_depth >= depth:
+                if flag == EXACT:
+                    return value
+                elif flag == LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+        best = -WIN
+        best_move = None
+        for cell in self._ordered(game.moves(), table_move, ply):
+            game.play(cell)
+            try:
+                value = -self._negamax(depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                game.undo()
+
+            if value > best:
+                best = value
+                best_move = cell
+            if value > alpha:
+                alpha = value
+            if alpha >= beta:
+                killers = self.killers[ply]
+                if killers[0] != cell:
+                    killers[1] = killers[0]
+                    killers[0] = cell
+                self.history[cell] += depth * depth
+                break
+
+        if best <= start_alpha:
+            flag = UPPER
+        elif best >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.table[game.hash] = (depth, flag, _to_table(best, ply), best_move)
+        return best
+
+    def _ordered(self, moves, table_move, ply):
+        """
+        Table move first, then killers, then the rest by threat and history.
+        """
+        game = self.game
+        killers = self.killers[ply]
+        history = self.history
+
+        def key(cell):
+            if cell == table_move:
+                return (2, 0)
+            if cell in killers:
+                return (1, 0)
+            return (0, game.threat(cell) + history[cell])
+
+        return sorted(moves, key=key, reverse=True)
+
+
+def _to_table(value, ply):
+    # Forced results are stored relative to the node, not the root
+    if value >= WIN - MAX_PLY:
+        return value + ply
+    if value <= -(WIN - MAX_PLY):
+        return value - ply
+    return value
+
+
+def _from_table(value, ply):
+    if value >= WIN - MAX_PLY:
+        return value - ply
+    if value <= -(WIN - MAX_PLY):
+        return value + ply
+    return value
+
+
+def best_move(board, k=3, budget=1.0):
+    """
+    Returns the best action (i, j) for the player to move on a
+    list-of-lists board, searching for at most `budget` seconds.
+    """
+    game = Game.from_lists(board, k)
+    cell = Search(game).best_move(budget)
+    return None if cell is None else divmod(cell, game.n)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Self-play an m,n,k-game.")
+    parser.add_argument("m", nargs="?", type=int, default=3)
+    parser.add_argument("n", nargs="?", type=int, default=3)
+    parser.add_argument("k", nargs="?", type=int, default=3)
+    parser.add_argument("--budget", type=float, default=1.0,
+                        help="seconds per move")
+    args = parser.parse_args()
+
+    game = Game(args.m, args.n, args.k)
+    search = Search(game)
+    while not game.terminal():
+        player = game.player()
+        cell = search.best_move(args.budget)
+        game.play(cell)
+        if abs(search.score) >= WIN - MAX_PLY:
+            plies = WIN - abs(search.score)
+            outlook = f"{'wins' if search.score > 0 else 'loses'} in {plies} plies"
+        else:
+            outlook = f"score {search.score}"
+        print(f"{player} plays {divmod(cell, game.n)}: depth {search.depth}, "
+              f"{search.nodes} nodes, {outlook}")
+    print(game)
+    print(f"Winner: {game.winner}" if game.winner else "Draw")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,10 +4,15 @@ Tic Tac Toe Player
 
 import math
 
+import book
+
 X = "X"
 O = "O"
 EMPTY = None
 
+# Positions visited by _negamax, for benchmarks
+nodes = 0
+
 
 def initial_state():
     """
@@ -130,18 +135,14 @@ def minimax(board):
         record = []
 
         for action in canDo:
-            # Direct winning
-            if winner(result(board, action)) == player:
+            # Calculating best value for each case, direct wins included
+            value = book.value(result(board, action))
+            if value==1 and isPlaying==X:
+                return action
+            elif value==-1 and isPlaying==O:
                 return action
-            # Calculating best value for each case
             else:
-                value = _poweredUpHelper(result(board, action))
-                if value==1 and isPlaying==X:
-                    return action
-                elif value==-1 and isPlaying==O:
-                    return action
-                else:
-                    record.append({"value": value, "action":action})
+                record.append({"value": value, "action":action})
 
         # Choosing action leading to state with best value for the current player.
         handle = min if isPlaying==O else max
@@ -195,3 +196,60 @@ def _poweredUpHelper(board, alpha=None):
                 beta = value
 
         return ans
+
+
+def _negamax(board, alpha=-1, beta=1, tables=None):
+    """
+    Returns the value of the board for the player to move: 1 if they win,
+    -1 if they lose, 0 for a draw.
+
+    Fail-soft alpha-beta: the result is exact if it lies strictly between
+    alpha and beta, otherwise it is a bound on that side of the window.
+
+    `tables` holds the move ordering tables, shared by the recursive
+    calls of one search. A top-level call starts with empty ones, so they
+    go away with the search instead of growing across games.
+    """
+    global nodes
+    nodes += 1
+    if tables is None:
+        tables = ({}, {}, {})
+    # Board -> best action found for it last time; empty cells left -> last
+    # action that caused a cutoff there; action -> how often (weighted by
+    # depth) it caused cutoffs
+    principal, killers, history = tables
+
+    isPlaying = player(board)
+    if terminal(board):
+        return utility(board) if isPlaying==X else -utility(board)
+
+    key = tuple(map(tuple, board))
+    depth = sum(row.count(EMPTY) for row in board)
+    best_action = principal.get(key)
+    killer = killers.get(depth)
+
+    def order(action):
+        return (action != best_action, action != killer, -history.get(action, 0))
+
+    best = -2   # Below any real value
+    for action in sorted(actions(board), key=order):
+        value = -_negamax(result(board, action), -beta, -alpha, tables)
+        if value > best:
+            best = value
+            principal[key] = action
+        if value > alpha:
+            alpha = value
+        if alpha >= beta:   # The previous player won't allow this line
+            killers[depth] = action
+            history[action] = history.get(action, 0) + depth * depth
+            break
+
+    return best
+
+
+def reset_search():
+    """
+    Clears the node counter of _negamax.
+    """
+    global nodes
+    nodes = 0
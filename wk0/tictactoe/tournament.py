@@ -0,0 +1,191 @@
+"""
+Headless self-play tournament between Tic Tac Toe AIs.
+
+Usage: python tournament.py [engine ...] [--games N] [--opening PLIES]
+                            [--workers N] [--seed SEED]
+
+Every pair of engines plays N games, swapping sides each game, spread over
+a process pool. The first PLIES moves of each game are random so games
+between deterministic engines differ. Reports win/draw/loss per pairing
+and, per engine, its record, mean and p99 move latency and mean nodes
+searched per move.
+
+Engines:
+  helper    picks moves by valuing each child with plain _helper
+  powered   the same with _poweredUpHelper
+  negamax   the same with _negamax
+  minimax   the public minimax (opening book, else the bitboard engine),
+            with the bitboard transposition table cleared before every
+            move so its nodes don't depend on earlier moves and games
+  mnk       the m,n,k-game engine with a 0.1s budget
+  random    a uniformly random legal move
+"""
+
+import argparse
+import itertools
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import bitboard
+import mnk
+import tictactoe as ttt
+from benchmark import count_calls
+
+ENGINES = ["helper", "powered", "negamax", "minimax", "mnk", "random"]
+MNK_BUDGET = 0.1
+
+# Call counters installed in each pool worker by _setup_worker
+_counters = {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tic Tac Toe engine tournament.")
+    parser.add_argument("engines", nargs="*", default=ENGINES,
+                        help=f"engines to play, from {', '.join(ENGINES)}")
+    parser.add_argument("--games", type=int, default=4,
+                        help="games per pairing")
+    parser.add_argument("--opening", type=int, default=1,
+                        help="random moves at the start of each game")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=50)
+    args = parser.parse_args()
+
+    for engine in args.engines:
+        if engine not in ENGINES:
+            parser.error(f"unknown engine: {engine}")
+
+    tasks = []
+    seeds = random.Random(args.seed)
+    for first, second in itertools.combinations(args.engines, 2):
+        for game in range(args.games):
+            x, o = (first, second) if game % 2 == 0 else (second, first)
+            tasks.append((x, o, seeds.getrandbits(32), args.opening))
+
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_setup_worker) as pool:
+        games = list(pool.map(play_game, tasks))
+
+    report(args.engines, games)
+
+
+def report(engines, games):
+    """
+    Prints pairing results and per-engine records, latencies and nodes.
+    """
+    records = {engine: [0, 0, 0] for engine in engines}
+    pairings = {}
+    latencies = {engine: [] for engine in engines}
+    nodes = {engine: 0 for engine in engines}
+
+    for game in games:
+        x, o, winner = game["x"], game["o"], game["winner"]
+        for engine, mark in ((x, ttt.X), (o, ttt.O)):
+            outcome = 1 if winner is None else (0 if winner == mark else 2)
+            records[engine][outcome] += 1
+        first, second = sorted((x, o), key=engines.index)
+        pairing = pairings.setdefault((first, second), [0, 0, 0])
+        if winner is None:
+            pairing[1] += 1
+        else:
+            pairing[0 if (x if winner == ttt.X else o) == first else 2] += 1
+
+        for engine, seconds, count in game["moves"]:
+            latencies[engine].append(seconds * 1000)
+            nodes[engine] += count
+
+    print(f"{'pairing':<24}{'W':>5}{'D':>5}{'L':>5}")
+    for (first, second), (won, drawn, lost) in pairings.items():
+        print(f"{first + ' vs ' + second:<24}{won:>5}{drawn:>5}{lost:>5}")
+
+    print()
+    print(f"{'engine':<10}{'W':>5}{'D':>5}{'L':>5}{'moves':>8}"
+          f"{'mean ms':>10}{'p99 ms':>10}{'nodes/move':>12}")
+    for engine in engines:
+        won, drawn, lost = records[engine]
+        moves = sorted(latencies[engine])
+        if moves:
+            mean = sum(moves) / len(moves)
+            p99 = moves[min(len(moves) - 1, int(len(moves) * 0.99))]
+            per_move = nodes[engine] / len(moves)
+        else:
+            mean = p99 = per_move = 0
+        print(f"{engine:<10}{won:>5}{drawn:>5}{lost:>5}{len(moves):>8}"
+              f"{mean:>10.3f}{p99:>10.3f}{per_move:>12.1f}")
+
+
+def play_game(task):
+    """
+    Plays one game, returning the engines, the winner (X, O or None) and
+    (engine, seconds, nodes) for every engine move.
+    """
+    x, o, seed, opening = task
+    rng = random.Random(seed)
+    board = ttt.initial_state()
+    for _ in range(opening):
+        if ttt.terminal(board):
+            break
+        board = ttt.result(board, rng.choice(sorted(ttt.actions(board))))
+
+    moves = []
+    while not ttt.terminal(board):
+        engine = x if ttt.player(board) == ttt.X else o
+        start = time.perf_counter()
+        action, count = choose(engine, board, rng)
+        moves.append((engine, time.perf_counter() - start, count))
+        board = ttt.result(board, action)
+
+    return {"x": x, "o": o, "winner": ttt.winner(board), "moves": moves}
+
+
+def choose(engine, board, rng):
+    """
+    Returns (action, nodes searched) for `engine` on `board`.
+    """
+    if engine == "random":
+        return rng.choice(sorted(ttt.actions(board))), 0
+
+    if engine == "minimax":
+        # Start each move cold, or the nodes counted would depend on
+        # whatever this worker searched before
+        bitboard.table.clear()
+        _counters["negamax"][0] = 0
+        return ttt.minimax(board), _counters["negamax"][0]
+
+    if engine == "mnk":
+        game = mnk.Game.from_lists(board, 3)
+        search = mnk.Search(game)
+        cell = search.best_move(MNK_BUDGET)
+        return divmod(cell, game.n), search.nodes
+
+    # Value every child with a helper and keep the best for the mover
+    isPlaying = ttt.player(board)
+    sign = 1 if isPlaying == ttt.X else -1
+    best_action = None
+    best_value = None
+    nodes = 0
+    for action in sorted(ttt.actions(board)):
+        child = ttt.result(board, action)
+        if engine == "negamax":
+            ttt.nodes = 0
+            value = -ttt._negamax(child)
+            nodes += ttt.nodes
+        else:
+            calls = _counters[engine]
+            calls[0] = 0
+            value = sign * (ttt._helper(child) if engine == "helper"
+                            else ttt._poweredUpHelper(child))
+            nodes += calls[0]
+        if best_value is None or value > best_value:
+            best_action, best_value = action, value
+    return best_action, nodes
+
+
+def _setup_worker():
+    _counters["helper"] = count_calls(ttt, "_helper")
+    _counters["powered"] = count_calls(ttt, "_poweredUpHelper")
+    _counters["negamax"] = count_calls(bitboard, "negamax")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,399 @@
+"""
+Reduced ordered binary decision diagrams (OBDDs) for logic sentences.
+
+A BDD manager stores every node once in a unique table, so two formulas
+are equivalent exactly when they compile to the same node, and memoises
+apply() in a cache. Variables are ordered by first appearance in a
+depth-first walk of the sentences compiled, which keeps symbols that are
+used together close in the order; symbols first seen later go at the end.
+
+Knowledge compiles a knowledge base fact by fact, conjoining new facts
+onto the BDD built so far; facts added together are conjoined pairwise
+first. The traversals use explicit stacks rather than recursion, so BDDs
+thousands of levels deep are fine. Once compiled:
+
+- entailment of a symbol or negated symbol is a set lookup, from the
+  literals implied by the knowledge (found in one pass per knowledge base),
+- entailment of any other query is one apply(),
+- counting models is linear in the size of the BDD.
+
+model_check(knowledge, query, engine="bdd") in logic.py goes through
+knowledge_for(), which keeps the compiled knowledge around and only adds
+the facts appended with And.add() since the last call.
+
+Works with the sentence classes of logic.py and myLogic.py, going by class
+name like cnf.py does, but without importing anything from this package.
+"""
+
+FALSE = 0
+TRUE = 1
+
+YES = "YES"
+NO = "NO"
+MAYBE = "MAYBE"
+
+# Compiled knowledge bases kept by knowledge_for()
+CACHE_SIZE = 32
+_compiled = {}
+
+
+class BDD:
+    def __init__(self):
+        # Node i tests variable level[i]; terminals sit below every variable
+        self.level = [float("inf"), float("inf")]
+        self.low = [FALSE, TRUE]
+        self.high = [FALSE, TRUE]
+
+        self.unique = {}        # (level, low, high) -> node
+        self.cache = {}         # (operation, a, b) -> node
+
+        self.levels = {}        # Symbol name -> level
+        self.names = []         # Level -> symbol name
+
+    def __len__(self):
+        return len(self.level)
+
+    def declare(self, sentence):
+        """
+        Gives every new symbol in `sentence` the next level, in depth-first
+        order of first appearance.
+        """
+        stack = [sentence]
+        while stack:
+            sentence = stack.pop()
+            kind = type(sentence).__name__
+            if kind == "Symbol":
+                if sentence.name not in self.levels:
+                    self.levels[sentence.name] = len(self.names)
+                    self.names.append(sentence.name)
+            else:
+                stack.extend(reversed(_children(sentence)))
+
+    def variable(self, name):
+        if name not in self.levels:
+            self.levels[name] = len(self.names)
+            self.names.append(name)
+        return self.node(self.levels[name], FALSE, TRUE)
+
+    def node(self, level, low, high):
+        if low == high:
+            return low
+        key = (level, low, high)
+        node = self.unique.get(key)
+        if node is None:
+            node = len(self.level)
+            self.level.append(level)
+            self.low.append(low)
+            self.high.append(high)
+            self.unique[key] = node
+        return node
+
+    def negate(self, a):
+        # Iterative, with an explicit stack, so deep BDDs don't hit the
+        # recursion limit
+        stack = [a]
+        while stack:
+            node = stack[-1]
+            if self._negated(node) is not None:
+                stack.pop()
+                continue
+            low, high = self._negated(self.low[node]), self._negated(self.high[node])
+            if low is None:
+                stack.append(self.low[node])
+            if high is None:
+                stack.append(self.high[node])
+            if low is not None and high is not None:
+                self.cache[("not", node, None)] = self.node(self.level[node], low, high)
+                stack.pop()
+        return self._negated(a)
+
+    def apply(self, operation, a, b):
+        """
+        Combines two nodes with "and", "or" or "xor".
+        """
+        if operation not in ("and", "or", "xor"):
+            raise Exception(f"unknown BDD operation: {operation}")
+        result = self._applied(operation, a, b)
+        if result is not None:
+            return result
+
+        # Like negate(), iterative: a pair is combined once both pairs of
+        # cofactors below it have been
+        root = (a, b)
+        stack = [root]
+        while stack:
+            a, b = stack[-1]
+            if self._applied(operation, a, b) is not None:
+                stack.pop()
+                continue
+
+            level = min(self.level[a], self.level[b])
+            a_low, a_high = (self.low[a], self.high[a]) if self.level[a] == level else (a, a)
+            b_low, b_high = (self.low[b], self.high[b]) if self.level[b] == level else (b, b)
+            low = self._applied(operation, a_low, b_low)
+            high = self._applied(operation, a_high, b_high)
+            if low is None:
+                stack.append((a_low, b_low))
+            if high is None:
+                stack.append((a_high, b_high))
+            if low is not None and high is not None:
+                self.cache[(operation, min(a, b), max(a, b))] = self.node(level, low, high)
+                stack.pop()
+        return self._applied(operation, *root)
+
+    def _negated(self, a):
+        """
+        The negation of a, if it is a terminal or already computed.
+        """
+        if a <= TRUE:
+            return TRUE - a
+        return self.cache.get(("not", a, None))
+
+    def _applied(self, operation, a, b):
+        """
+        apply(operation, a, b), if a terminal case or already computed.
+        """
+        if operation == "and":
+            if a == FALSE or b == FALSE:
+                return FALSE
+            if a == TRUE or a == b:
+                return b
+            if b == TRUE:
+                return a
+        elif operation == "or":
+            if a == TRUE or b == TRUE:
+                return TRUE
+            if a == FALSE or a == b:
+                return b
+            if b == FALSE:
+                return a
+        else:
+            if a == b:
+                return FALSE
+            if a == FALSE:
+                return b
+            if b == FALSE:
+                return a
+            if a == TRUE:
+                return self.negate(b)
+            if b == TRUE:
+                return self.negate(a)
+
+        # All three are commutative
+        return self.cache.get((operation, min(a, b), max(a, b)))
+
+    def compile(self, sentence, memo=None):
+        """
+        Returns the node of `sentence`.
+        """
+        if memo is None:
+            self.declare(sentence)
+            memo = {}
+
+        kind = type(sentence).__name__
+        if kind == "Symbol":
+            return self.variable(sentence.name)
+        if id(sentence) in memo:
+            return memo[id(sentence)]
+
+        if kind == "Not":
+            result = self.negate(self.compile(sentence.operand, memo))
+        elif kind == "And":
+            result = TRUE
+            for conjunct in _children(sentence):
+                result = self.apply("and", result, self.compile(conjunct, memo))
+                if result == FALSE:
+                    break
+        elif kind == "Or":
+            result = FALSE
+            for disjunct in _children(sentence):
+                result = self.apply("or", result, self.compile(disjunct, memo))
+                if result == TRUE:
+                    break
+        elif kind == "Implication":
+            result = self.apply("or", self.negate(self.compile(sentence.antecedent, memo)),
+                                self.compile(sentence.consequent, memo))
+        elif kind in ("Biconditional", "BiConditional"):
+            result = self.negate(self.apply("xor", self.compile(sentence.left, memo),
+                                            self.compile(sentence.right, memo)))
+        else:
+            raise TypeError(f"cannot compile {kind} to a BDD")
+
+        memo[id(sentence)] = result
+        return result
+
+    def count(self, root):
+        """
+        Number of assignments to all declared variables that satisfy root.
+        """
+        variables = len(self.names)
+
+        def level(node):
+            return variables if node <= TRUE else self.level[node]
+
+        def combine(node, low, high):
+            return (low * 2 ** (level(self.low[node]) - level(node) - 1)
+                    + high * 2 ** (level(self.high[node]) - level(node) - 1))
+
+        return self._bottom_up(root, {FALSE: 0, TRUE: 1}, combine) * 2 ** level(root)
+
+    def implied(self, root):
+        """
+        Returns {name: value} for every variable that has the same value in
+        all assignments satisfying root, or None if root is FALSE.
+        """
+        # Literals are level + 1 for true, -(level + 1) for false
+        def combine(node, low, high):
+            literal = self.level[node] + 1
+            if low is None:
+                return high | {literal}
+            if high is None:
+                return low | {-literal}
+            return low & high
+
+        literals = self._bottom_up(root, {FALSE: None, TRUE: frozenset()}, combine)
+        if literals is None:
+            return None
+        return {self.names[abs(literal) - 1]: literal > 0 for literal in literals}
+
+    def _bottom_up(self, root, memo, combine):
+        """
+        Computes combine(node, value of low, value of high) for every node
+        below root, children first, starting from the terminals' values in
+        memo. Returns root's value.
+        """
+        stack = [root]
+        while stack:
+            node = stack[-1]
+            if node in memo:
+                stack.pop()
+                continue
+            low, high = self.low[node], self.high[node]
+            if low in memo and high in memo:
+                memo[node] = combine(node, memo[low], memo[high])
+                stack.pop()
+            else:
+                stack.extend(child for child in (low, high) if child not in memo)
+        return memo[root]
+
+
+class Knowledge:
+    """
+    A knowledge base compiled to a BDD, one fact at a time.
+    """
+
+    def __init__(self, bdd=None):
+        self.bdd = bdd or BDD()
+        self.root = TRUE
+        self.facts = []
+        self.symbols = set()
+        self._implied = None
+
+    def add(self, sentence):
+        self.root = self.bdd.apply("and", self.root, self.bdd.compile(sentence))
+        self.facts.append(sentence)
+        self.symbols |= sentence.symbols()
+        self._implied = None
+
+    def extend(self, sentences):
+        """
+        Adds several facts at once. They are conjoined pairwise, as a
+        balanced tree, so each apply() works on BDDs of similar size
+        instead of rebuilding the whole BDD once per fact.
+        """
+        nodes = [self.bdd.compile(sentence) for sentence in sentences]
+        while len(nodes) > 1:
+            nodes = [self.bdd.apply("and", *nodes[i:i + 2]) if i + 1 < len(nodes) else nodes[i]
+                     for i in range(0, len(nodes), 2)]
+        if nodes:
+            self.root = self.bdd.apply("and", self.root, nodes[0])
+        for sentence in sentences:
+            self.facts.append(sentence)
+            self.symbols |= sentence.symbols()
+        self._implied = None
+
+    def entails(self, query):
+        if self.root == FALSE:
+            return True
+
+        kind = type(query).__name__
+        negated = kind == "Not" and type(query.operand).__name__ == "Symbol"
+        if kind == "Symbol" or negated:
+            if self._implied is None:
+                self._implied = self.bdd.implied(self.root)
+            name = query.operand.name if negated else query.name
+            return self._implied.get(name) == (not negated)
+
+        counter = self.bdd.apply("and", self.root, self.bdd.negate(self.bdd.compile(query)))
+        return counter == FALSE
+
+    def answer(self, query):
+        """
+        YES if the knowledge entails query, NO if it entails its negation,
+        MAYBE otherwise.
+        """
+        if self.entails(query):
+            return YES
+        node = self.bdd.compile(query)
+        if self.bdd.apply("and", self.root, node) == FALSE:
+            return NO
+        return MAYBE
+
+    def count(self):
+        """
+        Number of models of the knowledge over its own symbols.
+        """
+        extra = len(self.bdd.names) - len(self.symbols)
+        return self.bdd.count(self.root) >> extra
+
+
+def knowledge_for(sentence):
+    """
+    Returns the Knowledge compiled from `sentence`, reusing the one from an
+    earlier call if the sentence is a top-level And that only grew by
+    And.add() since. That is detected with the generation counter of
+    logic.Sentence; sentences without one are compiled from scratch.
+    """
+    generation = getattr(type(sentence), "generation", None)
+    facts = _children(sentence) if type(sentence).__name__ == "And" else [sentence]
+
+    entry = _compiled.get(id(sentence))
+    if entry is not None and generation is not None:
+        cached, cached_generation, knowledge = entry
+        grown = len(facts) - len(knowledge.facts)
+        if (cached is sentence and generation - cached_generation == grown >= 0
+                and all(a is b for a, b in zip(facts, knowledge.facts))):
+            knowledge.extend(facts[len(knowledge.facts):])
+            _compiled[id(sentence)] = (sentence, generation, knowledge)
+            return knowledge
+
+    knowledge = Knowledge()
+    knowledge.extend(facts)
+    if generation is not None:
+        if len(_compiled) >= CACHE_SIZE:
+            _compiled.clear()
+        _compiled[id(sentence)] = (sentence, generation, knowledge)
+    return knowledge
+
+
+def model_check(knowledge, query):
+    return knowledge_for(knowledge).entails(query)
+
+
+def model_check_many(knowledge, queries):
+    knowledge = knowledge_for(knowledge)
+    return [knowledge.answer(query) for query in queries]
+
+
+def _children(sentence):
+    """
+    The sub-sentences of any sentence.
+    """
+    for attribute in ("conjuncts", "disjuncts", "operands"):
+        if hasattr(sentence, attribute):
+            return list(getattr(sentence, attribute))
+    children = []
+    for attribute in ("operand", "antecedent", "consequent", "left", "right"):
+        if hasattr(sentence, attribute):
+            children.append(getattr(sentence, attribute))
+    return children
@@ -99,7 +99,7 @@ def main():
             print("    Not yet implemented.")
         else:
             for symbol in symbols:
-                if model_check(knowledge, symbol):
+                if model_check(knowledge, symbol, engine="bdd"):
                     print(f"    {symbol}")
 
 
@@ -0,0 +1,183 @@
+"""
+Benchmarks for the puzzle scripts' knowledge bases.
+
+Usage: python benchmark.py [--repeat N] [--engines ENGINE ...]
+
+Each script is run with `logic`/`myLogic` both pointing at the module
+under test and model_check/model_check_many replaced by recorders, so
+only building the knowledge bases is timed. Scripts whose other imports
+are missing here are skipped.
+
+Sentences: builds every knowledge base with logic.py (hash-consed, cached
+hashes and symbol sets) and with myLogic.py (plain trees, everything
+recomputed), then calls symbols() and hash() `repeat` times on each
+knowledge base and query.
+
+Queries: answers YES / NO / MAYBE for every symbol a script asks about,
+once with a per-symbol loop in the style clue.py used to have (model_check
+on the symbol, then on its negation) and once with a single
+model_check_many call, per engine.
+"""
+
+import argparse
+import os
+import runpy
+import sys
+import time
+
+import logic
+import myLogic
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS = [
+    os.path.join(HERE, "clue.py"),
+    os.path.join(HERE, "mastermind.py"),
+    os.path.join(HERE, "puzzle.py"),
+    os.path.join(HERE, "..", "knights", "puzzle.py"),
+]
+MODULES = [("myLogic", myLogic), ("logic", logic)]
+ENGINES = ["enumerate", "compiled", "bulk", "sat", "bdd"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the logic puzzle knowledge bases.")
+    parser.add_argument("--repeat", type=int, default=100,
+                        help="symbols()/hash() calls per sentence")
+    parser.add_argument("--engines", nargs="*", default=ENGINES, choices=ENGINES)
+    args = parser.parse_args()
+
+    scripts = []
+    for script in SCRIPTS:
+        name = os.path.relpath(script, HERE)
+        try:
+            record(script, logic)
+        except ImportError as e:
+            print(f"{name}: skipped, {e}")
+            continue
+        scripts.append((name, script))
+
+    print()
+    print(f"{'script':<22}{'module':<10}{'sentences':>10}{'nodes':>8}"
+          f"{'build s':>10}{'symbols s':>11}{'hash s':>10}")
+    for name, script in scripts:
+        for module_name, module in MODULES:
+            start = time.perf_counter()
+            _, sentences = record(script, module)
+            build = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                for sentence in sentences:
+                    sentence.symbols()
+            symbols = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                for sentence in sentences:
+                    hash(sentence)
+            hashing = time.perf_counter() - start
+
+            print(f"{name:<22}{module_name:<10}{len(sentences):>10}{count_nodes(sentences):>8}"
+                  f"{build:>10.4f}{symbols:>11.4f}{hashing:>10.4f}")
+
+    print()
+    print(f"{'script':<22}{'engine':<11}{'queries':>8}{'loop s':>10}{'many s':>10}{'speedup':>9}")
+    for name, script in scripts:
+        calls, _ = record(script, logic)
+        for engine in args.engines:
+            loop = many = 0
+            queries = 0
+            for knowledge, symbols in calls:
+                start = time.perf_counter()
+                expected = [answer_one(knowledge, symbol, engine) for symbol in symbols]
+                loop += time.perf_counter() - start
+
+                start = time.perf_counter()
+                answers = logic.model_check_many(knowledge, symbols, engine)
+                many += time.perf_counter() - start
+
+                if answers != expected:
+                    raise Exception(f"{name}: model_check_many disagrees with model_check")
+                queries += len(symbols)
+            print(f"{name:<22}{engine:<11}{queries:>8}{loop:>10.3f}{many:>10.3f}"
+                  f"{loop / many if many else 0:>8.1f}x")
+
+
+def answer_one(knowledge, query, engine):
+    if logic.model_check(knowledge, query, engine):
+        return logic.YES
+    if logic.model_check(knowledge, logic.Not(query), engine):
+        return logic.NO
+    return logic.MAYBE
+
+
+def record(script, module):
+    """
+    Runs `script` against `module`. Returns the (knowledge, [symbols])
+    it asked about, with one entry per knowledge base, and the distinct
+    sentences involved including any module-level knowledge bases.
+    """
+    calls = {}
+    sentences = {}
+
+    def ask(knowledge, queries):
+        sentences[id(knowledge)] = knowledge
+        entry = calls.setdefault(id(knowledge), (knowledge, []))
+        for query in queries:
+            sentences[id(query)] = query
+            # Negated symbols are asked about through their symbol
+            symbol = getattr(query, "operand", query)
+            if type(symbol).__name__ == "Symbol" and symbol not in entry[1]:
+                entry[1].append(symbol)
+
+    def model_check(knowledge, query, *args, **kwargs):
+        ask(knowledge, [query])
+        return False
+
+    def model_check_many(knowledge, queries, *args, **kwargs):
+        ask(knowledge, queries)
+        return [module.MAYBE] * len(queries)
+
+    saved = {name: sys.modules.get(name) for name in ("logic", "myLogic")}
+    originals = module.model_check, module.model_check_many
+    sys.modules["logic"] = sys.modules["myLogic"] = module
+    module.model_check, module.model_check_many = model_check, model_check_many
+    try:
+        namespace = runpy.run_path(script, run_name="benchmark")
+    finally:
+        module.model_check, module.model_check_many = originals
+        for name, saved_module in saved.items():
+            sys.modules[name] = saved_module
+
+    # knights/puzzle.py only asks from main(), so take its knowledge bases
+    # and symbols from the module namespace
+    if not calls:
+        symbols = [value for value in namespace.values()
+                   if type(value).__name__ == "Symbol"]
+        for value in namespace.values():
+            if isinstance(value, (logic.And, myLogic.And)):
+                ask(value, symbols)
+    return list(calls.values()), list(sentences.values())
+
+
+def count_nodes(sentences):
+    """
+    Distinct sentence objects reachable from `sentences`.
+    """
+    seen = set()
+    stack = list(sentences)
+    while stack:
+        sentence = stack.pop()
+        if id(sentence) in seen:
+            continue
+        seen.add(id(sentence))
+        for attribute in ("operand", "antecedent", "consequent", "left", "right"):
+            if hasattr(sentence, attribute):
+                stack.append(getattr(sentence, attribute))
+        for attribute in ("conjuncts", "disjuncts", "operands"):
+            stack.extend(getattr(sentence, attribute, ()))
+    return len(seen)
+
+
+if __name__ == "__main__":
+    main()
@@ -21,10 +21,10 @@ symbols = characters + rooms + weapons
 
 
 def check_knowledge(knowledge):
-    for symbol in symbols:
-        if model_check(knowledge, symbol):
+    for symbol, answer in zip(symbols, model_check_many(knowledge, symbols, engine="bdd")):
+        if answer == YES:
             termcolor.cprint(f"{symbol}: YES", "green")
-        elif not model_check(knowledge, Not(symbol)):
+        elif answer == MAYBE:
             print(f"{symbol}: MAYBE")
 
 
@@ -0,0 +1,155 @@
+"""
+Tseitin transformation of logic sentences into CNF.
+
+Every compound sentence gets a fresh variable that is constrained to be
+equivalent to it, so the clause count grows linearly with the size of the
+sentence instead of exponentially as with distributing Or over And.
+Sentences asserted at the top level skip the extra variable where they
+can: an And is asserted conjunct by conjunct, an Or of literals becomes a
+single clause.
+
+Works with the sentence classes of both logic.py and myLogic.py, going by
+class name and by whichever of conjuncts/disjuncts/operands they have.
+
+Literals are non-zero ints in the DIMACS style: variable v is v, its
+negation is -v.
+
+Literals of compound sentences are cached by object, which is only safe
+while no And has grown. logic.py counts add() calls in
+Sentence.generation, and the cache is dropped when that changes. Sentence
+classes without such a counter get a fresh cache for every literal()
+call.
+"""
+
+
+class CNF:
+    def __init__(self):
+        self.variables = {}     # Symbol name -> variable
+        self.names = [None]     # Variable -> symbol name, None for Tseitin variables
+        self.clauses = []
+
+        # id(sentence) -> literal, with the sentences kept alive so ids aren't
+        # reused, valid in the sentence generation it was built in
+        self.literals = {}
+        self.compiled = []
+        self.generation = None
+        self.true = None
+
+    def variable(self, name):
+        """
+        Returns the variable of a symbol, creating it if needed.
+        """
+        var = self.variables.get(name)
+        if var is None:
+            var = self.new_variable(name)
+            self.variables[name] = var
+        return var
+
+    def new_variable(self, name=None):
+        self.names.append(name)
+        return len(self.names) - 1
+
+    def constant(self, value):
+        """
+        A literal that is always `value`.
+        """
+        if self.true is None:
+            self.true = self.new_variable()
+            self.clauses.append([self.true])
+        return self.true if value else -self.true
+
+    def add(self, sentence):
+        """
+        Adds clauses asserting that `sentence` is true.
+        """
+        self.clauses.extend(self.assertion(sentence))
+
+    def assertion(self, sentence):
+        """
+        Returns the clauses asserting that `sentence` is true, without
+        adding them. Clauses defining the Tseitin variables involved are
+        added, since they hold either way.
+        """
+        kind = type(sentence).__name__
+        if kind == "And":
+            clauses = []
+            for conjunct in operands(sentence):
+                clauses.extend(self.assertion(conjunct))
+            return clauses
+        if kind == "Or":
+            return [[self.literal(disjunct) for disjunct in operands(sentence)]]
+        if kind == "Implication":
+            return [[-self.literal(sentence.antecedent), self.literal(sentence.consequent)]]
+        return [[self.literal(sentence)]]
+
+    def literal(self, sentence):
+        """
+        Returns a literal equivalent to `sentence`, adding the clauses that
+        define it.
+        """
+        generation = getattr(type(sentence), "generation", None)
+        if generation is None or generation != self.generation:
+            # Some And may have grown since the cached literals were made
+            self.literals = {}
+            self.compiled = []
+            self.generation = generation
+        return self._literal(sentence)
+
+    def _literal(self, sentence):
+        kind = type(sentence).__name__
+        if kind == "Symbol":
+            return self.variable(sentence.name)
+        if kind == "Not":
+            return -self._literal(sentence.operand)
+
+        literal = self.literals.get(id(sentence))
+        if literal is not None:
+            return literal
+
+        if kind == "And":
+            literal = self._and([self._literal(c) for c in operands(sentence)])
+        elif kind == "Or":
+            literal = -self._and([-self._literal(d) for d in operands(sentence)])
+        elif kind == "Implication":
+            literal = -self._and([self._literal(sentence.antecedent),
+                                  -self._literal(sentence.consequent)])
+        elif kind in ("Biconditional", "BiConditional"):
+            literal = self._iff(self._literal(sentence.left), self._literal(sentence.right))
+        else:
+            raise TypeError(f"cannot compile {kind} to CNF")
+
+        self.literals[id(sentence)] = literal
+        self.compiled.append(sentence)
+        return literal
+
+    def _and(self, literals):
+        if not literals:
+            return self.constant(True)
+        if len(literals) == 1:
+            return literals[0]
+
+        # a <=> l1 & l2 & ... & ln
+        a = self.new_variable()
+        for literal in literals:
+            self.clauses.append([-a, literal])
+        self.clauses.append([a] + [-literal for literal in literals])
+        return a
+
+    def _iff(self, left, right):
+        # a <=> (left <=> right)
+        a = self.new_variable()
+        self.clauses.append([-a, -left, right])
+        self.clauses.append([-a, left, -right])
+        self.clauses.append([a, left, right])
+        self.clauses.append([a, -left, -right])
+        return a
+
+
+def operands(sentence):
+    """
+    The children of an And or Or, whichever logic module it came from.
+    """
+    for attribute in ("conjuncts", "disjuncts", "operands"):
+        if hasattr(sentence, attribute):
+            return getattr(sentence, attribute)
+    raise TypeError(f"{type(sentence).__name__} has no operands")
@@ -0,0 +1,202 @@
+"""
+An incremental knowledge base.
+
+The puzzle scripts build one And(...), add() to it and run model_check
+from scratch after every change. KnowledgeBase keeps the work between
+changes instead:
+
+- Every fact told is compiled to CNF (cnf.py) once, with its clauses
+  guarded by a selector variable of its own: clause or not selector. The
+  facts in force are the selectors assumed true, so one SAT solver
+  (sat.py) holds every fact ever told, and what it learns stays valid
+  whichever facts are in force.
+- The selectors are assumed one decision level each, in the order told,
+  so the solver's trail doubles as the trail of the knowledge base.
+  Telling a fact propagates only its own selector on top of what is
+  already there, and the literals on the trail are the consequences of
+  the facts by unit propagation, which answer symbol queries with no
+  search. Retracting the last fact undoes just its level; retracting an
+  older one redoes the levels of the facts told after it.
+- Answers are cached. Telling a fact keeps the YES answers and
+  retracting one keeps the MAYBE answers, since those can't change. A
+  query may be an And that is added to later, so with logic.py the cache
+  is dropped whenever Sentence.generation moves on, as cnf.py does.
+
+Run this file to check it against model_check_many.
+
+Works with the sentence classes of logic.py and myLogic.py alike.
+"""
+
+from cnf import CNF
+from evaluator import MAYBE, NO, YES, answer
+from sat import Solver
+
+
+class KnowledgeBase:
+    def __init__(self, *sentences):
+        self.cnf = CNF()
+        self.solver = Solver()
+        self.facts = []         # (sentence, selector) in force, in the order told
+        self.answers = {}       # Query -> cached answer
+        self._generation = None # Sentence generation the answers were cached in
+        self._defined = 0       # Clauses of self.cnf already given to the solver
+        self._implied = None    # Literals implied by propagation, None if not worked out, False if inconsistent
+        self._consistent = None # Whether the facts have a model, None if not worked out
+        for sentence in sentences:
+            self.tell(sentence)
+
+    def __len__(self):
+        return len(self.facts)
+
+    def __contains__(self, sentence):
+        return any(fact == sentence for fact, _ in self.facts)
+
+    def sentences(self):
+        return [fact for fact, _ in self.facts]
+
+    def tell(self, sentence):
+        """
+        Adds `sentence` to the knowledge base.
+        """
+        clauses = self.cnf.assertion(sentence)
+        self._define()
+        selector = self.cnf.new_variable()
+        for clause in clauses:
+            self.solver.add_clause([-selector] + clause)
+
+        self.facts.append((sentence, selector))
+        self.answers = {query: value for query, value in self.answers.items() if value == YES}
+        self._implied = None
+        self._consistent = None
+
+    def retract(self, sentence=None):
+        """
+        Removes the most recently told fact equal to `sentence`, or the
+        last fact told if `sentence` is None, and returns it.
+        """
+        for i in reversed(range(len(self.facts))):
+            if sentence is None or self.facts[i][0] == sentence:
+                break
+        else:
+            raise Exception(f"{sentence} is not in the knowledge base")
+
+        fact, _ = self.facts.pop(i)
+        self.answers = {query: value for query, value in self.answers.items() if value == MAYBE}
+        self._implied = None
+        self._consistent = None
+        return fact
+
+    def implied(self):
+        """
+        The literals that follow from the facts by unit propagation, as a
+        set of cnf.py literals, or None if propagation alone shows the
+        facts are inconsistent.
+        """
+        if self._implied is None:
+            if self.solver.assume(self._selectors()):
+                self._implied = set(self.solver.trail)
+            else:
+                self._implied = False
+        return None if self._implied is False else self._implied
+
+    def consistent(self):
+        """
+        Whether the facts have a model at all.
+        """
+        if self._consistent is None:
+            self._consistent = self.implied() is not None and self.solver.solve(self._selectors())
+        return self._consistent
+
+    def ask(self, query):
+        """
+        YES if the knowledge base entails query, NO if it entails its
+        negation, MAYBE otherwise, as model_check_many answers.
+        """
+        generation = getattr(type(query), "generation", None)
+        if generation != self._generation:
+            self.answers = {}
+            self._generation = generation
+        if query in self.answers:
+            return self.answers[query]
+
+        implied = self.implied()
+        if implied is None:
+            return YES
+
+        # Symbols and negated symbols are often settled by propagation
+        kind = type(query).__name__
+        symbol = query.operand if kind == "Not" else query
+        if type(symbol).__name__ == "Symbol" and symbol.name in self.cnf.variables:
+            literal = self.cnf.variables[symbol.name]
+            if kind == "Not":
+                literal = -literal
+            if literal in implied:
+                return YES
+            # Inconsistent facts entail everything, which propagation
+            # alone might not have shown
+            if -literal in implied and self.consistent():
+                return NO
+
+        literal = self.cnf.literal(query)
+        self._define()
+        selectors = self._selectors()
+        fails = self.solver.solve(selectors + [-literal])
+        holds = fails and self.solver.solve(selectors + [literal])
+        value = answer(holds, fails)
+        self.answers[query] = value
+        return value
+
+    def entails(self, query):
+        return self.ask(query) == YES
+
+    # Internals
+
+    def _selectors(self):
+        return [selector for _, selector in self.facts]
+
+    def _define(self):
+        """
+        Gives the solver the clauses defining new Tseitin variables.
+        """
+        for clause in self.cnf.clauses[self._defined:]:
+            self.solver.add_clause(clause)
+        self._defined = len(self.cnf.clauses)
+
+
+def check():
+    """
+    Compares ask() with model_check_many on a few knowledge bases,
+    including a query that grows between asks.
+    """
+    from logic import And, Biconditional, Implication, Not, Or, Symbol, model_check_many
+
+    a, b, c, d = Symbol("a"), Symbol("b"), Symbol("c"), Symbol("d")
+
+    # An And query that grows must not keep its old answer
+    knowledge = KnowledgeBase(a, Not(b))
+    query = And(a)
+    if knowledge.ask(query) != YES:
+        raise Exception("And(a) should be entailed")
+    query.add(b)
+    if knowledge.ask(query) != NO:
+        raise Exception("And(a, b) should be contradicted after add()")
+
+    facts = [Or(a, b), Implication(a, c), Biconditional(c, Not(d)), Not(d)]
+    queries = [a, b, c, d, Not(c), And(b, c), Or(Not(a), d), Implication(c, b)]
+    knowledge = KnowledgeBase()
+    for fact in facts:
+        knowledge.tell(fact)
+        expected = model_check_many(And(*knowledge.sentences()), queries, "enumerate")
+        if [knowledge.ask(query) for query in queries] != expected:
+            raise Exception(f"ask() disagrees with model_check_many after telling {fact}")
+    while knowledge.sentences():
+        knowledge.retract(facts[0])
+        facts.pop(0)
+        expected = model_check_many(And(*knowledge.sentences()), queries, "enumerate")
+        if [knowledge.ask(query) for query in queries] != expected:
+            raise Exception("ask() disagrees with model_check_many after a retract")
+    print("knowledge.py: ok")
+
+
+if __name__ == "__main__":
+    check()
@@ -1,5 +1,51 @@
+import itertools
+import weakref
+
+# Answers of model_check_many
+YES = "YES"
+NO = "NO"
+MAYBE = "MAYBE"
+
+
 class Sentence():
 
+    # Immutable sentences are hash-consed: building the same sentence twice
+    # out of the same parts gives back the same object.
+    interned = weakref.WeakValueDictionary()
+
+    # Bumped by And.add. Cached hashes and symbol sets are only trusted if
+    # they were computed in the current generation, since any sentence may
+    # contain the And that changed.
+    generation = 0
+    _hash_generation = -1
+    _symbols_generation = -1
+
+    def __new__(cls, *args, **kwargs):
+        # Only positional arguments make up the key, so sentences built
+        # with keywords, like Symbol(name="x"), are just not interned
+        key = cls.intern_key(args) if args and not kwargs else None
+        if key is None:
+            return super().__new__(cls)
+        sentence = Sentence.interned.get(key)
+        if sentence is None:
+            sentence = super().__new__(cls)
+            Sentence.interned[key] = sentence
+        return sentence
+
+    @classmethod
+    def intern_key(cls, args):
+        """Key identifying a sentence built from args, or None to not intern it."""
+        return (cls,) + tuple(id(arg) for arg in args)
+
+    def __hash__(self):
+        if self._hash_generation != Sentence.generation:
+            self._hash = self.compute_hash()
+            self._hash_generation = Sentence.generation
+        return self._hash
+
+    def compute_hash(self):
+        return id(self)
+
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
@@ -10,6 +56,16 @@ class Sentence():
 
     def symbols(self):
         """Returns a set of all symbols in the logical sentence."""
+        return set(self.symbol_set())
+
+    def symbol_set(self):
+        """Returns the cached frozenset of symbols, which must not be changed."""
+        if self._symbols_generation != Sentence.generation:
+            self._symbols = frozenset(self.compute_symbols())
+            self._symbols_generation = Sentence.generation
+        return self._symbols
+
+    def compute_symbols(self):
         return set()
 
     @classmethod
@@ -44,8 +100,12 @@ class Symbol(Sentence):
     def __init__(self, name):
         self.name = name
 
+    @classmethod
+    def intern_key(cls, args):
+        return (cls, args[0])
+
     def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+        return self is other or (isinstance(other, Symbol) and self.name == other.name)
 
     def __hash__(self):
         return hash(("symbol", self.name))
@@ -57,12 +117,12 @@ class Symbol(Sentence):
         try:
             return bool(model[self.name])
         except KeyError:
-            raise EvaluationException(f"variable {self.name} not in model")
+            raise Exception(f"variable {self.name} not in model")
 
     def formula(self):
         return self.name
 
-    def symbols(self):
+    def compute_symbols(self):
         return {self.name}
 
 
@@ -72,9 +132,11 @@ class Not(Sentence):
         self.operand = operand
 
     def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+        return self is other or (isinstance(other, Not) and self.operand == other.operand)
 
-    def __hash__(self):
+    __hash__ = Sentence.__hash__
+
+    def compute_hash(self):
         return hash(("not", hash(self.operand)))
 
     def __repr__(self):
@@ -86,8 +148,8 @@ class Not(Sentence):
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
-        return self.operand.symbols()
+    def compute_symbols(self):
+        return self.operand.symbol_set()
 
 
 class And(Sentence):
@@ -96,10 +158,17 @@ class And(Sentence):
             Sentence.validate(conjunct)
         self.conjuncts = list(conjuncts)
 
+    @classmethod
+    def intern_key(cls, args):
+        # Ands can grow with add(), so every And is a new object
+        return None
+
     def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+        return self is other or (isinstance(other, And) and self.conjuncts == other.conjuncts)
 
-    def __hash__(self):
+    __hash__ = Sentence.__hash__
+
+    def compute_hash(self):
         return hash(
             ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
         )
@@ -113,6 +182,7 @@ class And(Sentence):
     def add(self, conjunct):
         Sentence.validate(conjunct)
         self.conjuncts.append(conjunct)
+        Sentence.generation += 1
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
@@ -123,8 +193,8 @@ class And(Sentence):
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def compute_symbols(self):
+        return frozenset().union(*[conjunct.symbol_set() for conjunct in self.conjuncts])
 
 
 class Or(Sentence):
@@ -134,9 +204,11 @@ class Or(Sentence):
         self.disjuncts = list(disjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+        return self is other or (isinstance(other, Or) and self.disjuncts == other.disjuncts)
 
-    def __hash__(self):
+    __hash__ = Sentence.__hash__
+
+    def compute_hash(self):
         return hash(
             ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
         )
@@ -154,8 +226,8 @@ class Or(Sentence):
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def compute_symbols(self):
+        return frozenset().union(*[disjunct.symbol_set() for disjunct in self.disjuncts])
 
 
 class Implication(Sentence):
@@ -166,11 +238,13 @@ class Implication(Sentence):
         self.consequent = consequent
 
     def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+        return self is other or (isinstance(other, Implication)
+                                 and self.antecedent == other.antecedent
+                                 and self.consequent == other.consequent)
 
-    def __hash__(self):
+    __hash__ = Sentence.__hash__
+
+    def compute_hash(self):
         return hash(("implies", hash(self.antecedent), hash(self.consequent)))
 
     def __repr__(self):
@@ -185,8 +259,8 @@ class Implication(Sentence):
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def compute_symbols(self):
+        return self.antecedent.symbol_set() | self.consequent.symbol_set()
 
 
 class Biconditional(Sentence):
@@ -197,11 +271,13 @@ class Biconditional(Sentence):
         self.right = right
 
     def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
+        return self is other or (isinstance(other, Biconditional)
+                                 and self.left == other.left
+                                 and self.right == other.right)
 
-    def __hash__(self):
+    __hash__ = Sentence.__hash__
+
+    def compute_hash(self):
         return hash(("biconditional", hash(self.left), hash(self.right)))
 
     def __repr__(self):
@@ -218,12 +294,43 @@ class Biconditional(Sentence):
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
-
-
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+    def compute_symbols(self):
+        return self.left.symbol_set() | self.right.symbol_set()
+
+
+def model_check(knowledge, query, engine="enumerate"):
+    """
+    Checks if knowledge base entails query.
+
+    engine="enumerate" tries every model; engine="sat" compiles both to
+    CNF and asks the SAT solver in sat.py for a model of knowledge and
+    not query instead. engine="compiled" and engine="bulk" enumerate
+    models with the compiled evaluator in evaluator.py, one at a time or
+    all at once. engine="bdd" compiles knowledge to a BDD (bdd.py), which
+    is kept and extended as knowledge grows, for fast repeated queries.
+    engine="parallel" splits the models between processes (parallel.py),
+    for knowledge bases with too many symbols to enumerate in one.
+    engine="resolution" looks for a resolution refutation (resolution.py),
+    which is fast for short proofs however many symbols there are.
+    """
+    # Imported here so this module still works on its own
+    if engine == "sat":
+        from sat import entails
+        return entails(knowledge, query)
+    elif engine == "bdd":
+        import bdd
+        return bdd.model_check(knowledge, query)
+    elif engine == "parallel":
+        import parallel
+        return parallel.model_check(knowledge, query)
+    elif engine == "resolution":
+        import resolution
+        return resolution.model_check(knowledge, query)
+    elif engine in ("compiled", "bulk"):
+        import evaluator
+        return evaluator.model_check(knowledge, query, bulk=engine == "bulk")
+    elif engine != "enumerate":
+        raise Exception(f"unknown model_check engine: {engine}")
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
@@ -258,3 +365,53 @@ def model_check(knowledge, query):
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+def model_check_many(knowledge, queries, engine="enumerate"):
+    """
+    Answers YES if knowledge entails the query, NO if it entails its
+    negation and MAYBE otherwise, for every query in one pass over the
+    models of knowledge. Engines are the same as for model_check.
+    """
+    # Imported here so this module still works on its own
+    if engine == "sat":
+        from sat import entails_many
+        return entails_many(knowledge, queries)
+    elif engine == "bdd":
+        import bdd
+        return bdd.model_check_many(knowledge, queries)
+    elif engine in ("compiled", "bulk"):
+        import evaluator
+        return evaluator.model_check_many(knowledge, queries, bulk=engine == "bulk")
+    elif engine != "enumerate":
+        raise Exception(f"unknown model_check engine: {engine}")
+
+    symbols = sorted(set.union(knowledge.symbols(), *[query.symbols() for query in queries]))
+
+    # Whether each query held / failed in some model of the knowledge base
+    holds = [False] * len(queries)
+    fails = [False] * len(queries)
+
+    for values in itertools.product((True, False), repeat=len(symbols)):
+        model = dict(zip(symbols, values))
+        if not knowledge.evaluate(model):
+            continue
+        for i, query in enumerate(queries):
+            if query.evaluate(model):
+                holds[i] = True
+            else:
+                fails[i] = True
+
+        # Stop once nothing can change any more
+        if all(holds) and all(fails):
+            break
+
+    answers = []
+    for held, failed in zip(holds, fails):
+        if not failed:
+            answers.append(YES)
+        elif not held:
+            answers.append(NO)
+        else:
+            answers.append(MAYBE)
+    return answers
@@ -51,6 +51,6 @@ knowledge.add(And(
     Not(Symbol("yellow3"))
 ))
 
-for symbol in symbols:
-    if model_check(knowledge, symbol):
+for symbol, answer in zip(symbols, model_check_many(knowledge, symbols)):
+    if answer == YES:
         print(symbol)
@@ -1,4 +1,10 @@
 
+import itertools
+
+YES = 'YES'
+NO = 'NO'
+MAYBE = 'MAYBE'
+
 class Statement:
 
     def formula(self):
@@ -215,9 +221,32 @@ class BiConditional(Statement):
     def symbols(self):
         return set.union(self.left.symbols(), self.right.symbols())    
 
-def model_check(knowledge, query):
+def model_check(knowledge, query, engine='enumerate'):
     # To Check if Knowledge *Base* entails query.
 
+    if engine=='sat':
+        # Knowledge entails query iff (knowledge AND NOT query) has no model, see sat.py
+        from sat import entails
+        return entails(knowledge, query)
+    elif engine=='bdd':
+        # Knowledge compiled to a decision diagram, see bdd.py
+        import bdd
+        return bdd.model_check(knowledge, query)
+    elif engine=='parallel':
+        # Models split into chunks checked by a process pool, see parallel.py
+        import parallel
+        return parallel.model_check(knowledge, query)
+    elif engine=='resolution':
+        # Refutation of knowledge AND NOT query, see resolution.py
+        import resolution
+        return resolution.model_check(knowledge, query)
+    elif engine in ('compiled', 'bulk'):
+        # Same enumeration, over sentences compiled to Python expressions, see evaluator.py
+        import evaluator
+        return evaluator.model_check(knowledge, query, bulk=engine=='bulk')
+    elif engine!='enumerate':
+        raise Exception(f'Unknown model_check engine: {engine}')
+
     def check_all(knowledge, query, symbols, model):
         # Checks if Knowledge entails query, given a particular model
 
@@ -241,3 +270,37 @@ def model_check(knowledge, query):
     # Collecting all symbols, using the helper function. 
     symbols = set.union(knowledge.symbols(), query.symbols())
     return check_all(knowledge, query, symbols, dict())
+
+def model_check_many(knowledge, queries, engine='enumerate'):
+    # YES / NO / MAYBE for each query, going over the models of the Knowledge *Base* only once.
+
+    if engine=='sat':
+        from sat import entails_many
+        return entails_many(knowledge, queries)
+    elif engine=='bdd':
+        import bdd
+        return bdd.model_check_many(knowledge, queries)
+    elif engine in ('compiled', 'bulk'):
+        import evaluator
+        return evaluator.model_check_many(knowledge, queries, bulk=engine=='bulk')
+    elif engine!='enumerate':
+        raise Exception(f'Unknown model_check engine: {engine}')
+
+    symbols = sorted(set.union(knowledge.symbols(), *[query.symbols() for query in queries]))
+    holds = [False] * len(queries)     # Query true in some model of knowledge
+    fails = [False] * len(queries)     # Query false in some model of knowledge
+
+    for values in itertools.product((True, False), repeat=len(symbols)):
+        model = dict(zip(symbols, values))
+        if not knowledge.evaluate(model):
+            continue
+        for i, query in enumerate(queries):
+            if query.evaluate(model):
+                holds[i] = True
+            else:
+                fails[i] = True
+        if all(holds) and all(fails):   # Everything is a MAYBE already
+            break
+
+    # Never false -> entailed, never true -> contradicted
+    return [YES if not failed else NO if not held else MAYBE for held, failed in zip(holds, fails)]
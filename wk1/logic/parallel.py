@@ -0,0 +1,121 @@
+"""
+Model checking split across processes.
+
+The 2^n assignments are partitioned by fixing the top k symbols, giving
+2^k chunks of 2^(n-k) assignments each, which a process pool checks
+independently. Within a chunk all assignments are evaluated at once with
+the bit-parallel truth tables of evaluator.py: the free symbols are
+ordinary columns, the fixed ones all-ones or zero.
+
+Workers never see Sentence objects. knowledge and query are compiled
+once, in the parent, to the source of functions computing their truth
+tables, and those strings are sent to each worker as it starts. The
+first worker to find a counter-model sets a shared event, so the others
+skip their remaining chunks, and the chunks not yet started are
+cancelled.
+"""
+
+import math
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from evaluator import CompiledSentence, column, define
+
+# Largest chunk, as a number of free symbols, evaluated in one go
+CHUNK_SYMBOLS = 20
+
+# Chunks per worker, so that uneven chunks still balance out
+CHUNKS_PER_WORKER = 8
+
+# Below this many symbols a pool costs more than it saves
+PARALLEL_SYMBOLS = 20
+
+# Worker state, set up once per process by _setup_worker
+_knowledge = None
+_query = None
+_symbols = 0
+_fixed = 0
+_stop = None
+_columns = None
+
+
+def model_check(knowledge, query, workers=None):
+    """
+    Checks if knowledge entails query, by looking for a counter-model in
+    parallel.
+    """
+    return counter_model(knowledge, query, workers) is None
+
+
+def counter_model(knowledge, query, workers=None):
+    """
+    Returns a model of knowledge in which query is false, as
+    {symbol name: bool}, or None if knowledge entails query.
+    """
+    symbols = set.union(knowledge.symbols(), query.symbols())
+    knowledge = CompiledSentence(knowledge, symbols)
+    query = CompiledSentence(query, symbols)
+    sources = knowledge.bitwise_source("knowledge"), query.bitwise_source("query")
+
+    n = len(symbols)
+    workers = workers or os.cpu_count() or 1
+    fixed = max(n - CHUNK_SYMBOLS, min(n, math.ceil(math.log2(workers * CHUNKS_PER_WORKER))))
+    if n < PARALLEL_SYMBOLS or workers == 1:
+        fixed = max(n - CHUNK_SYMBOLS, 0)
+        workers = 1
+
+    stop = multiprocessing.Event()
+    if workers == 1:
+        _setup_worker(sources, n, fixed, stop)
+        for chunk in range(1 << fixed):
+            bits = _check_chunk(chunk)
+            if bits is not None:
+                return knowledge.unpack(bits)
+        return None
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_setup_worker,
+                             initargs=(sources, n, fixed, stop)) as pool:
+        pending = {pool.submit(_check_chunk, chunk) for chunk in range(1 << fixed)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                bits = future.result()
+                if bits is not None:
+                    stop.set()
+                    for other in pending:
+                        other.cancel()
+                    return knowledge.unpack(bits)
+    return None
+
+
+def _setup_worker(sources, symbols, fixed, stop):
+    global _knowledge, _query, _symbols, _fixed, _stop, _columns
+    _knowledge = define(sources[0], "knowledge")
+    _query = define(sources[1], "query")
+    _symbols = symbols
+    _fixed = fixed
+    _stop = stop
+    _columns = None
+
+
+def _check_chunk(chunk):
+    """
+    Returns the first assignment of `chunk` where knowledge holds and the
+    query doesn't, as packed bits, or None.
+    """
+    global _columns
+    if _stop.is_set():
+        return None
+
+    free = _symbols - _fixed
+    full = (1 << (1 << free)) - 1
+    if _columns is None:
+        _columns = [column(i, free) for i in range(free)]
+    columns = _columns + [full if chunk >> j & 1 else 0 for j in range(_fixed)]
+
+    table = _knowledge(columns, full) & (full ^ _query(columns, full))
+    if not table:
+        return None
+    first = (table & -table).bit_length() - 1
+    return (chunk << free) | first
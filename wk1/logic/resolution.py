@@ -0,0 +1,198 @@
+"""
+Entailment by resolution refutation.
+
+knowledge entails query when knowledge and not query resolve to the
+empty clause. Both are turned into clauses with cnf.py, and the prover
+runs the given-clause loop:
+
+- Set of support: only clauses that come from the negated query, or were
+  resolved from one, are picked as the given clause. Knowledge clauses
+  are never resolved with each other. That can only miss a refutation
+  when the knowledge on its own is inconsistent, so before answering
+  False, entails() checks that it isn't with the SAT solver.
+- Unit preference: the shortest clause waiting in the set of support is
+  picked next, so units are used as soon as they appear. A unit clause
+  also removes the opposite literal from every clause, kept or new.
+- A clause index, from each literal to the clauses containing it, finds
+  resolution partners and subsumption candidates without scanning every
+  clause.
+- Forward subsumption drops a new clause if a kept clause is a subset of
+  it. Backward subsumption deletes the kept clauses a new clause is a
+  subset of.
+- A step limit bounds the number of resolvents. The prover gives up
+  when the limit is reached.
+
+The work depends on the proof, not on the number of models. A proof of a
+few steps stays a few steps however many symbols the knowledge has. To
+show a query is *not* entailed, though, the set of support has to be
+saturated, which can take far more steps than a model check would.
+
+Literals are DIMACS style ints, as in cnf.py.
+"""
+
+import heapq
+
+from cnf import CNF
+from sat import satisfiable
+
+# Resolvents to try before giving up
+STEP_LIMIT = 100000
+
+
+class Prover:
+    def __init__(self, limit=STEP_LIMIT):
+        self.limit = limit
+        self.steps = 0
+
+        self.clauses = []       # Clause id -> frozenset of literals, None once deleted
+        self.index = {}         # Literal -> ids of kept clauses containing it
+        self.usable = set()     # Ids of clauses resolution partners are taken from
+        self.support = []       # Heap of (length, id) waiting to be given
+        self.proof = None       # Id of the empty clause once found
+        self.units = {}         # Literal -> id of its unit clause
+
+        self.subsumed = 0
+
+    def add(self, literals, support=False):
+        """
+        Adds an input clause, to the set of support if `support` is set,
+        otherwise straight to the usable clauses.
+        """
+        self._keep(literals, usable=not support)
+
+    def prove(self):
+        """
+        Returns True if the clauses were refuted, False if the set of
+        support ran out without reaching the empty clause, or None if the
+        step limit was reached first.
+        """
+        while self.proof is None and self.support:
+            _, given = heapq.heappop(self.support)
+            clause = self.clauses[given]
+            if clause is None:
+                continue
+            self.usable.add(given)
+
+            for literal in clause:
+                for partner in list(self.index.get(-literal, ())):
+                    if partner not in self.usable or self.clauses[partner] is None:
+                        continue
+                    if self.steps >= self.limit:
+                        heapq.heappush(self.support, (len(clause), given))
+                        self.usable.discard(given)
+                        return None
+                    self.steps += 1
+
+                    resolvent = (clause - {literal}) | (self.clauses[partner] - {-literal})
+                    self._keep(resolvent, usable=False)
+                    if self.proof is not None:
+                        return True
+                    if self.clauses[given] is None:
+                        break
+                if self.clauses[given] is None:
+                    break
+        return self.proof is not None
+
+    # Internals
+
+    def _keep(self, literals, usable):
+        clause = frozenset(literals)
+        if any(-literal in clause for literal in clause):
+            return None
+        # Resolve away literals that contradict a unit clause straight off
+        clause = frozenset(literal for literal in clause if -literal not in self.units)
+        if self._subsumed(clause):
+            self.subsumed += 1
+            return None
+
+        self._subsume(clause)
+        i = len(self.clauses)
+        self.clauses.append(clause)
+        if not clause:
+            self.proof = i
+            return i
+        for literal in clause:
+            self.index.setdefault(literal, set()).add(i)
+        if usable:
+            self.usable.add(i)
+        else:
+            heapq.heappush(self.support, (len(clause), i))
+
+        if len(clause) == 1:
+            # And shorten the clauses kept already, which stay usable only
+            # if both this unit and they were
+            (unit,) = clause
+            self.units[unit] = i
+            for j in list(self.index.get(-unit, ())):
+                if self.clauses[j] is None:
+                    continue
+                shorter = self.clauses[j] - {-unit}
+                both = usable and j in self.usable
+                self._delete(j)
+                self._keep(shorter, both)
+                if self.proof is not None:
+                    break
+        return i
+
+    def _subsumed(self, clause):
+        """
+        Forward subsumption: is some kept clause a subset of `clause`?
+        """
+        if self.proof is not None:
+            return True
+        for literal in clause:
+            for i in self.index.get(literal, ()):
+                if self.clauses[i] <= clause:
+                    return True
+        return False
+
+    def _subsume(self, clause):
+        """
+        Backward subsumption: deletes the kept clauses that contain
+        `clause`. They all contain its rarest literal, so only those are
+        checked.
+        """
+        if not clause:
+            return
+        rarest = min(clause, key=lambda literal: len(self.index.get(literal, ())))
+        for i in list(self.index.get(rarest, ())):
+            if clause <= self.clauses[i]:
+                self._delete(i)
+                self.subsumed += 1
+
+    def _delete(self, i):
+        for literal in self.clauses[i]:
+            self.index[literal].discard(i)
+            if self.units.get(literal) == i:
+                del self.units[literal]
+        self.clauses[i] = None
+        self.usable.discard(i)
+
+
+def entails(knowledge, query, limit=STEP_LIMIT):
+    """
+    Checks if knowledge entails query by resolution. Returns True or
+    False, or None if the prover gave up after `limit` resolvents.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+    known = len(cnf.clauses)
+    cnf.clauses.append([-cnf.literal(query)])
+
+    # The query's own Tseitin clauses go in the set of support as well
+    prover = Prover(limit)
+    for i, clause in enumerate(cnf.clauses):
+        prover.add(clause, support=i >= known)
+    result = prover.prove()
+
+    # Inconsistent knowledge entails everything
+    if result is False and satisfiable(knowledge) is None:
+        return True
+    return result
+
+
+def model_check(knowledge, query, limit=STEP_LIMIT):
+    result = entails(knowledge, query, limit)
+    if result is None:
+        raise Exception(f"resolution gave up after {limit} steps")
+    return result
@@ -0,0 +1,404 @@
+"""
+A small CDCL SAT solver, and entailment checking on top of it.
+
+The solver is DPLL with unit propagation over two watched literals per
+clause, plus conflict-driven clause learning (first UIP) and
+non-chronological backjumping. Decisions follow VSIDS activity with
+phase saving, and it restarts every so often. Clauses can be added
+between calls to solve() and learnt clauses are kept, so one solver can
+answer a series of related questions; solve() also takes assumptions,
+which hold for that call only.
+
+Literals are non-zero ints: variable v is v, its negation is -v.
+"""
+
+import heapq
+
+from cnf import CNF
+from evaluator import YES, answer
+
+
+class Solver:
+    def __init__(self):
+        self.ok = True          # False once the clauses are unsatisfiable
+        self.clauses = []
+        self.learnts = []
+        self.watches = {}       # Literal -> clauses watching it
+
+        # Per variable, index 0 unused
+        self.value = [0]        # 1 true, -1 false, 0 unassigned
+        self.level = [0]
+        self.reason = [None]
+        self.activity = [0.0]
+        self.phase = [-1]
+
+        self.trail = []
+        self.trail_lim = []     # Trail length at the start of each decision level
+        self.assumed = []       # Assumption decided at each level, for the lowest levels
+        self.qhead = 0
+        self.order = []         # Heap of (-activity, variable), lazily updated
+        self.increment = 1.0
+
+        self.model = None
+        self.conflicts = 0
+        self.decisions = 0
+        self.propagations = 0
+
+    def variables(self):
+        return len(self.value) - 1
+
+    def ensure(self, var):
+        """
+        Makes room for variables up to `var`.
+        """
+        while len(self.value) <= var:
+            v = len(self.value)
+            self.value.append(0)
+            self.level.append(0)
+            self.reason.append(None)
+            self.activity.append(0.0)
+            self.phase.append(-1)
+            self.watches[v] = []
+            self.watches[-v] = []
+            heapq.heappush(self.order, (0.0, v))
+
+    def add_clause(self, literals):
+        """
+        Adds a clause, returning False if the clauses just became
+        unsatisfiable. The current assignments are kept unless the clause
+        is a unit or has fewer than two literals that aren't false.
+        """
+        if not self.ok:
+            return False
+
+        clause = []
+        for literal in literals:
+            self.ensure(abs(literal))
+            value = self._literal_value(literal) if self.level[abs(literal)] == 0 else 0
+            if value == 1 or -literal in clause:
+                return True     # Already satisfied
+            if value == 0 and literal not in clause:
+                clause.append(literal)
+
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self._backtrack(0)
+            self._enqueue(clause[0], None)
+            self.ok = self._propagate() is None
+        else:
+            # Watch two literals that aren't false, so nothing needs undoing
+            free = [i for i, literal in enumerate(clause) if self._literal_value(literal) != -1]
+            if len(free) < 2:
+                self._backtrack(0)
+            else:
+                for slot, i in enumerate(free[:2]):
+                    clause[slot], clause[i] = clause[i], clause[slot]
+            self._attach(clause)
+            self.clauses.append(clause)
+        return self.ok
+
+    def solve(self, assumptions=()):
+        """
+        Returns True if the clauses (and assumptions) are satisfiable,
+        leaving a model as {variable: bool} in self.model.
+        """
+        self.model = None
+        if not self.ok:
+            return False
+        for literal in assumptions:
+            self.ensure(abs(literal))
+        self._backtrack(self._assumed_prefix(assumptions))
+
+        restart_at = 100
+        conflicts = 0
+        while True:
+            conflict = self._propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                conflicts += 1
+                if not self.trail_lim:
+                    self.ok = False
+                    return False
+
+                learnt, level = self._analyze(conflict)
+                self._backtrack(level)
+                if len(learnt) == 1:
+                    self._enqueue(learnt[0], None)
+                else:
+                    self._attach(learnt)
+                    self.learnts.append(learnt)
+                    self._enqueue(learnt[0], learnt)
+                self.increment *= 1.05
+                continue
+
+            if conflicts >= restart_at:
+                conflicts = 0
+                restart_at = int(restart_at * 1.5)
+                self._backtrack(0)
+                continue
+
+            # Assumptions are decided first, one level each
+            if len(self.trail_lim) < len(assumptions):
+                literal = assumptions[len(self.trail_lim)]
+                value = self._literal_value(literal)
+                if value == -1:
+                    return False
+                self.trail_lim.append(len(self.trail))
+                self.assumed.append(literal)
+                if value == 0:
+                    self._enqueue(literal, None)
+                continue
+
+            var = self._pick()
+            if var is None:
+                self.model = {v: self.value[v] == 1 for v in range(1, len(self.value))}
+                return True
+            self.decisions += 1
+            self.trail_lim.append(len(self.trail))
+            self._enqueue(var * self.phase[var], None)
+
+    def assume(self, assumptions):
+        """
+        Sets the assumptions, one decision level each, and runs unit
+        propagation only. Levels of assumptions shared with the previous
+        call are kept, so adding an assumption at the end costs only its
+        own propagation. Returns False if propagation finds a conflict,
+        True otherwise; self.trail then holds every literal implied so
+        far.
+        """
+        if not self.ok:
+            return False
+        for literal in assumptions:
+            self.ensure(abs(literal))
+        self._backtrack(self._assumed_prefix(assumptions))
+        while True:
+            if self._propagate() is not None:
+                # Drop the level that conflicted, so it is redone next time
+                if not self.trail_lim:
+                    self.ok = False
+                else:
+                    self._backtrack(len(self.trail_lim) - 1)
+                return False
+            if len(self.trail_lim) == len(assumptions):
+                return True
+
+            literal = assumptions[len(self.trail_lim)]
+            value = self._literal_value(literal)
+            if value == -1:
+                return False
+            self.trail_lim.append(len(self.trail))
+            self.assumed.append(literal)
+            if value == 0:
+                self._enqueue(literal, None)
+
+    # Internals
+
+    def _assumed_prefix(self, assumptions):
+        """
+        How many decision levels, from the bottom, hold the same
+        assumptions as `assumptions` starts with.
+        """
+        prefix = 0
+        for assumed, literal in zip(self.assumed, assumptions):
+            if assumed != literal:
+                break
+            prefix += 1
+        return prefix
+
+    def _literal_value(self, literal):
+        value = self.value[abs(literal)]
+        return value if literal > 0 else -value
+
+    def _enqueue(self, literal, reason):
+        var = abs(literal)
+        self.value[var] = 1 if literal > 0 else -1
+        self.level[var] = len(self.trail_lim)
+        self.reason[var] = reason
+        self.trail.append(literal)
+
+    def _attach(self, clause):
+        self.watches[clause[0]].append(clause)
+        self.watches[clause[1]].append(clause)
+
+    def _propagate(self):
+        """
+        Runs unit propagation, returning a conflicting clause or None.
+        """
+        value = self.value
+        watches = self.watches
+        while self.qhead < len(self.trail):
+            false_literal = -self.trail[self.qhead]
+            self.qhead += 1
+            self.propagations += 1
+
+            watching = watches[false_literal]
+            keep = []
+            for i, clause in enumerate(watching):
+                # Keep the false literal in slot 1
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], clause[0]
+                first = clause[0]
+                if (value[first] if first > 0 else -value[-first]) == 1:
+                    keep.append(clause)
+                    continue
+
+                # Look for a new literal to watch
+                for k in range(2, len(clause)):
+                    literal = clause[k]
+                    if (value[literal] if literal > 0 else -value[-literal]) != -1:
+                        clause[1], clause[k] = literal, false_literal
+                        watches[literal].append(clause)
+                        break
+                else:
+                    keep.append(clause)
+                    if (value[first] if first > 0 else -value[-first]) == -1:
+                        keep.extend(watching[i + 1:])
+                        watches[false_literal] = keep
+                        self.qhead = len(self.trail)
+                        return clause
+                    self._enqueue(first, clause)
+            watches[false_literal] = keep
+        return None
+
+    def _analyze(self, conflict):
+        """
+        Derives the first-UIP clause from a conflict, returning it with the
+        asserting literal first and the level to backjump to.
+        """
+        current = len(self.trail_lim)
+        learnt = [None]
+        seen = set()
+        pending = 0
+        literal = None
+        index = len(self.trail) - 1
+        clause = conflict
+
+        while True:
+            for q in (clause if literal is None else clause[1:]):
+                var = abs(q)
+                if var not in seen and self.level[var] > 0:
+                    seen.add(var)
+                    self._bump(var)
+                    if self.level[var] == current:
+                        pending += 1
+                    else:
+                        learnt.append(q)
+
+            # Walk back to the next literal of this level in the conflict
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            clause = self.reason[abs(literal)]
+            pending -= 1
+            if not pending:
+                break
+
+        learnt[0] = -literal
+        if len(learnt) == 1:
+            return learnt, 0
+
+        # The highest other level goes in slot 1, so it is watched
+        best = max(range(1, len(learnt)), key=lambda i: self.level[abs(learnt[i])])
+        learnt[1], learnt[best] = learnt[best], learnt[1]
+        return learnt, self.level[abs(learnt[1])]
+
+    def _bump(self, var):
+        self.activity[var] += self.increment
+        if self.activity[var] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.increment *= 1e-100
+            self.order = [(-a, v) for v, a in enumerate(self.activity) if v and not self.value[v]]
+            heapq.heapify(self.order)
+        elif not self.value[var]:
+            heapq.heappush(self.order, (-self.activity[var], var))
+
+    def _pick(self):
+        while self.order:
+            _, var = heapq.heappop(self.order)
+            if not self.value[var]:
+                return var
+        return None
+
+    def _backtrack(self, level):
+        if len(self.trail_lim) <= level:
+            return
+        start = self.trail_lim[level]
+        for literal in self.trail[start:]:
+            var = abs(literal)
+            self.phase[var] = self.value[var]
+            self.value[var] = 0
+            self.reason[var] = None
+            heapq.heappush(self.order, (-self.activity[var], var))
+        del self.trail[start:]
+        del self.trail_lim[level:]
+        del self.assumed[level:]
+        self.qhead = len(self.trail)
+
+
+def satisfiable(sentence):
+    """
+    Returns a model of `sentence` as {symbol name: bool}, or None if it
+    has none.
+    """
+    cnf = CNF()
+    cnf.add(sentence)
+    solver = Solver()
+    for clause in cnf.clauses:
+        solver.add_clause(clause)
+    if not solver.solve():
+        return None
+    return {name: solver.model.get(var, False) for name, var in cnf.variables.items()}
+
+
+def entails(knowledge, query):
+    """
+    Checks if knowledge entails query: that knowledge and not query has
+    no model.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+    cnf.clauses.append([-cnf.literal(query)])
+    solver = Solver()
+    for clause in cnf.clauses:
+        if not solver.add_clause(clause):
+            return True
+    return not solver.solve()
+
+
+def entails_many(knowledge, queries):
+    """
+    Answers YES, NO or MAYBE for every query with one solver, which keeps
+    what it learns between queries. Every model found along the way
+    settles, for all queries at once, that they can hold or can fail.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+    literals = [cnf.literal(query) for query in queries]
+    solver = Solver()
+    solver.ensure(len(cnf.names) - 1)
+    for clause in cnf.clauses:
+        if not solver.add_clause(clause):
+            return [YES] * len(queries)
+
+    holds = [False] * len(queries)
+    fails = [False] * len(queries)
+
+    def note(model):
+        for i, literal in enumerate(literals):
+            if model[abs(literal)] == (literal > 0):
+                holds[i] = True
+            else:
+                fails[i] = True
+
+    if not solver.solve():
+        return [YES] * len(queries)
+    note(solver.model)
+
+    for i, literal in enumerate(literals):
+        if not fails[i] and solver.solve([-literal]):
+            note(solver.model)
+        if not holds[i] and solver.solve([literal]):
+            note(solver.model)
+    return [answer(h, f) for h, f in zip(holds, fails)]